@@ -0,0 +1,47 @@
+"""
+Created for the UoS QLM group on 14 October 2026. The purpose of this
+package is to handle communications between the local machine and the
+external lab equipment. The client classes and the functions used to find
+the instruments can be imported directly from the package (e.g. from coms
+import BKCom). The modules are only imported when one of their names is
+first used, so importing the package does not load pyvisa or pylablib.
+
+
+Last update: 14 October 2026.
+"""
+
+import importlib
+
+# names re-exported by the package and the module defining each of them
+_EXPORTS = {
+    'BKCom': 'coms.bk_precision_4063_b',
+    'KDC101Com': 'coms.thorlabs_kdc_101',
+    'get_resource_manager': 'coms.find_resources',
+    'iter_visa_instrument_identities': 'coms.find_resources',
+    'find_visa_instrument_identities': 'coms.find_resources',
+    'find_available_visa_instruments': 'coms.find_resources',
+    'iter_bk_precision_4063_b': 'coms.find_resources',
+    'find_first_bk_precision_4063_b': 'coms.find_resources',
+    'find_available_bk_precision_4063_b': 'coms.find_resources',
+    'find_available_kdc_101': 'coms.find_resources',
+    'invalidate_kdc_101_cache': 'coms.find_resources',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    """ Imports the module defining a re-exported name the first time the
+    name is used.
+
+    Args:
+        name: The name of the attribute looked up in the package.
+
+    Returns:
+        The object re-exported under the given name.
+    """
+    if name not in _EXPORTS:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(importlib.import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
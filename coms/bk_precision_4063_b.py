@@ -11,13 +11,37 @@ BK_4060B_Series Programming Manual (freely available online).
 See the end of the file for a code example.
 
 
-Last update: 28 October 2023.
+Last update: 14 October 2026.
 """
 
-import pyvisa
-from coms.find_resources import find_available_bk_precision_4063_b
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Sequence
+import asyncio
+import logging
+import queue
+import threading
 import time as time
 
+if TYPE_CHECKING:
+    import pyvisa
+
+log = logging.getLogger(__name__)
+
+# SCPI command templates (bound str.format methods) used by the BKCom client
+# methods, parsed once when the module is imported
+_OUTP_TEMPLATE = ('{channel}:OUTP {mode},LOAD,{load},'
+                  'PLRT,{polarisation}').format
+_WAVE_TEMPLATE = ('{channel}:BaSic_WaVe WVTP,{waveform_type},FRQ,'
+                  '{frequency}HZ,AMP,{amplitude}V,OFST,{offset}V,'
+                  'MAX_OUTPUT_AMP,{max_amplitude}V,WIDTH,{width}').format
+_MDWV_STATE_TEMPLATE = '{channel}:MDWV STATE,{mode}'.format
+_MDWV_TEMPLATE = ('{channel}:MDWV {modulation_type},MDSP,{wave_shape},'
+                  'SRC,{source},FRQ,{frequency}HZ,AMP,{amplitude}V,'
+                  'DEPTH,{depth},DEVI,{deviation}').format
+_BTWV_TEMPLATE = ('{channel}:BTWV STATE,{mode},PRD,{period},TRSR,{source},'
+                  'TIME,{cycles},GATE_NCYC,NCYC,CARR,WVTP,{carrier},'
+                  'AMP,{amplitude}V,OFST,{offset}V').format
+
 
 class BKCom:
     """ High level client class to provide communications between the local
@@ -31,25 +55,509 @@ class BKCom:
     set_channel_mode method should always be used first to enable the channel
     to send output signals.
 
+    Every command is sent to the BNC as a separate USB transaction. To
+    coalesce multiple commands into one SCPI compound message (commands
+    separated by ';'), call the client methods inside the batch context
+    manager:
+
+        with bk_com.batch():
+            bk_com.set_channel_mode(channel='C1', mode='ON')
+            bk_com.set_channel_mode(channel='C2', mode='ON')
+
+    set_channel_mode, send_waveform and set_digital_modulation skip writing
+    a command identical to the last one sent to the same channel. A command
+    is only remembered once it has been written (or, inside a batch, once
+    the whole batch has been written), and disabling a channel (mode 'OFF')
+    is never skipped. Call invalidate_cache if the instrument settings were
+    changed by other means.
+
+    Queries requested by the client methods (query_mode=True) are deferred
+    and only sent, in one compound query, when flush_queries is called. The
+    responses are logged at DEBUG level, so query_mode has no effect (no
+    USB traffic) unless debug logging is enabled for this module.
+
+    If background_writes is True, the messages are handed to a writer thread
+    so the client methods return without waiting for the USB transfer. The
+    messages are still written in order; call sync to wait until all of them
+    have been written (this is done automatically before any query). Call
+    wait_complete to also wait until the instrument has executed them.
+
+    The client methods can be called from multiple threads: a batch opened
+    by one thread blocks the writes (and batches) of the other threads until
+    it has been written.
+
+    Call close (or use the client object as a context manager) to release
+    the instrument once it is not needed anymore:
+
+        with BKCom() as bk_com:
+            bk_com.send_pulse()
+
     Attributes:
         resource: String representing the resource (as found by pyvisa)
             corresponding to the BK 4063 BNC. If None is given, the first
-            available found by the
-            coms.find_resources.find_available_bk_precision_4063_b function
-            will be used.
+            available in the order the resources are listed by pyvisa (see
+            coms.find_resources.find_first_bk_precision_4063_b) will be
+            used.
         instrument: pyvisa resource object to write commands and read data
             from the BK 4063B BNC (see pyvisa.resources.resource for more
             information).
+        resource_manager: pyvisa.ResourceManager used to open the
+            instrument. If None is given, the resource manager shared by
+            the whole package is used (see
+            coms.find_resources.get_resource_manager).
+        timeout: Integer representing the VISA timeout (measured in ms) of
+            the instrument. It is always passed to pyvisa as an integer as
+            float timeouts go through a slower conversion path in pyvisa-py.
+        chunk_size: The size (in bytes) of the chunks used by pyvisa to read
+            the responses of the instrument (default 1 MiB). Large enough so
+            that every response is read in one transfer. Keep in mind that
+            the pyvisa-py backend may ignore it, so prefer the NI-VISA
+            backend for large readbacks.
+        background_writes: Boolean representing whether the messages are
+            written to the instrument by a background writer thread
+            (default False, every write blocks until it is complete).
+        use_srq: Boolean representing whether flush_queries waits for the
+            responses using service requests (the thread blocks inside the
+            VISA backend, releasing the GIL, instead of in a synchronous
+            query). Falls back to a normal query if the VISA backend does
+            not support service request events.
+        use_batched: Boolean representing whether multiple commands are
+            joined into one SCPI compound message (default True). This
+            covers every compound message sent by the client: batches (see
+            batch and write_batch), send_waveform_many,
+            set_digital_modulation, flush_queries and the service request
+            setup. Set it to False to write the commands one by one, in
+            order, if the instrument (or a firmware version) rejects
+            compound messages.
     """
-
-    def __init__(self, resource: str = None) -> None:
-        # search for the available BK 4063B available if None is given
+    # termination appended to every (pre-encoded) message written
+    _TERMINATION = b'\n'
+
+    def __init__(self, resource: str = None,
+                 resource_manager: 'pyvisa.ResourceManager' = None,
+                 timeout: int = 2000, chunk_size: int = 1024 * 1024,
+                 background_writes: bool = False,
+                 use_srq: bool = False,
+                 use_batched: bool = True) -> None:
+        # use the first BK 4063B listed if None is given (the scan stops as
+        # soon as it is known)
         if resource is None:
-            self.resource = find_available_bk_precision_4063_b()[0]
+            from coms.find_resources import find_first_bk_precision_4063_b
+            self.resource = find_first_bk_precision_4063_b()
+            if self.resource is None:
+                raise Exception('DeviceNotFound')
         # else, use the resource provided
         else:
             self.resource = resource
-        self.instrument = pyvisa.ResourceManager().open_resource(self.resource)
+
+        # use the resource manager shared by the package if None is given
+        if resource_manager is None:
+            from coms.find_resources import get_resource_manager
+            resource_manager = get_resource_manager()
+        self.resource_manager = resource_manager
+        self.instrument = self.resource_manager.open_resource(self.resource)
+
+        # set the communication parameters explicitly
+        self.instrument.timeout = int(timeout)
+        self.instrument.chunk_size = int(chunk_size)
+        self.instrument.write_termination = self._TERMINATION.decode('ascii')
+        self.instrument.read_termination = self._TERMINATION.decode('ascii')
+
+        # lock held while a batch is open (and while a message is written
+        # or a query is sent), so that the client can be used from multiple
+        # threads (e.g. executor threads) at the same time
+        self._lock = threading.RLock()
+
+        # commands buffered while a batch is open. None means that the
+        # commands are written to the instrument straight away.
+        self._batch_commands = None
+        self.use_batched = use_batched
+
+        # queries requested via query_mode, read only by flush_queries
+        self._pending_queries: list[str] = []
+
+        # pre-encoded channel mode commands (the channels are toggled on
+        # and off very often, so their commands are encoded only once)
+        self._outp_commands: dict[tuple, bytes] = {}
+
+        # the last command sent for each (command type, channel) pair, used
+        # to skip writing commands identical to the current instrument state
+        self._last_commands: dict[tuple, bytes] = {}
+
+        # the commands buffered in the open batch (by key), only remembered
+        # in _last_commands once the batch has been written
+        self._batch_last_commands = None
+
+        # queue of the messages written by the background writer thread
+        # (None if every message is written straight away)
+        self._write_queue = None
+        self._writer_thread = None
+        self._writer_error = None
+        if background_writes:
+            self._write_queue = queue.SimpleQueue()
+            self._writer_thread = threading.Thread(target=self._writer,
+                                                   daemon=True)
+            self._writer_thread.start()
+
+        # whether the responses to the queries are waited for via service
+        # requests (see _enable_srq)
+        self._use_srq = use_srq and self._enable_srq()
+
+    def _enable_srq(self) -> bool:
+        """ Configures the instrument to request service once all the
+        pending operations are complete (operation complete bit of the
+        standard event register) and enables the service request events.
+
+        Returns:
+            Boolean representing whether service requests can be used.
+        """
+        from pyvisa import constants
+        try:
+            self.instrument.enable_event(constants.EventType.service_request,
+                                         constants.EventMechanism.queue)
+        except Exception as error:
+            log.warning('Service requests not supported (%s), using normal '
+                        'queries.', error)
+            return False
+
+        # operation complete -> event status bit of the status byte -> SRQ
+        self._send_commands((b'*ESE 1', b'*SRE 32'))
+        return True
+
+    def _query_srq(self, command: str) -> str:
+        """ Sends a query followed by *OPC and waits for the service request
+        before reading the response.
+
+        Args:
+            command: The SCPI query sent to the instrument.
+
+        Returns:
+            The response of the instrument.
+        """
+        from pyvisa import constants
+        # clear the status registers so that only this *OPC requests service
+        self._send_commands((b'*CLS', command.encode('ascii'), b'*OPC'))
+        self.sync()
+        self.instrument.wait_on_event(constants.EventType.service_request,
+                                      self.instrument.timeout)
+        return self.instrument.read()
+
+    def _writer(self) -> None:
+        """ Writes the messages put in the write queue, in order. Runs in the
+        background writer thread until None is put in the queue.
+        """
+        while True:
+            message = self._write_queue.get()
+            if message is None:
+                return
+            # sync markers are set once all the previous messages are written
+            if isinstance(message, threading.Event):
+                message.set()
+                continue
+            try:
+                self.instrument.write_raw(message)
+            except Exception as error:
+                # re-raised in the main thread by sync
+                self._writer_error = error
+
+    def _send(self, message: bytes) -> None:
+        """ Writes a terminated message to the instrument, or hands it to the
+        background writer thread if background_writes is enabled.
+
+        Args:
+            message: The message written to the instrument (with
+                termination).
+        """
+        if self._write_queue is None:
+            self.instrument.write_raw(message)
+        else:
+            self._write_queue.put(message)
+
+    def _send_commands(self, commands: Sequence[bytes]) -> None:
+        """ Sends multiple commands (see _send) as one SCPI compound message,
+        or one by one (in order) if use_batched is False.
+
+        Args:
+            commands: The SCPI commands sent to the instrument (ASCII
+                encoded, without termination).
+        """
+        if self.use_batched:
+            self._send(b';'.join(commands) + self._TERMINATION)
+        else:
+            for command in commands:
+                self._send(command + self._TERMINATION)
+
+    def sync(self) -> None:
+        """ Waits until all the messages handed to the background writer
+        thread have been written to the instrument. Does nothing if
+        background_writes is disabled.
+
+        Raises:
+            The first error raised by the background writer thread since the
+            last call to sync, if any. The cache of the last commands written
+            is cleared in this case, as some of them may have been lost.
+        """
+        if self._write_queue is None:
+            return
+        done = threading.Event()
+        self._write_queue.put(done)
+        done.wait()
+
+        if self._writer_error is not None:
+            error, self._writer_error = self._writer_error, None
+            self.invalidate_cache()
+            raise error
+
+    def close(self) -> None:
+        """ Waits for all the pending writes, stops the background writer
+        thread (if any) and closes the session with the instrument.
+        """
+        try:
+            self.sync()
+        finally:
+            if self._writer_thread is not None:
+                self._write_queue.put(None)
+                self._writer_thread.join()
+                self._write_queue = None
+                self._writer_thread = None
+            self.instrument.close()
+
+    def __enter__(self) -> 'BKCom':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _write_raw(self, command: bytes) -> None:
+        """ Writes an (ASCII encoded) command to the instrument or buffers it
+        if a batch is currently open (see the batch method).
+
+        Writing the raw bytes skips the string encoding and termination
+        handling done by pyvisa for every write.
+
+        Args:
+            command: The SCPI command sent to the instrument (without
+                termination).
+        """
+        with self._lock:
+            if self._batch_commands is None:
+                self._send(command + self._TERMINATION)
+            else:
+                self._batch_commands.append(command)
+
+    def _write_commands(self, commands: Sequence[bytes]) -> None:
+        """ Writes multiple (ASCII encoded) commands to the instrument (see
+        _send_commands) or buffers them if a batch is currently open.
+
+        Args:
+            commands: The SCPI commands sent to the instrument (without
+                termination).
+        """
+        with self._lock:
+            if self._batch_commands is None:
+                self._send_commands(commands)
+            else:
+                self._batch_commands.extend(commands)
+
+    def _write(self, command: str) -> None:
+        """ Encodes a command and writes it to the instrument (see
+        _write_raw).
+
+        Args:
+            command: The SCPI command sent to the instrument.
+        """
+        self._write_raw(command.encode('ascii'))
+
+    def _get_last_command(self, key: tuple) -> tuple | None:
+        """ Gets the last command written (or buffered in the open batch)
+        with a given key.
+
+        Args:
+            key: Tuple representing the command type and the channel it is
+                sent to.
+
+        Returns:
+            Tuple of the last commands (ASCII encoded) or None if they are not
+            known.
+        """
+        # a background write failed, so the cache may be ahead of the
+        # instrument until the error is raised (and the cache cleared) by
+        # sync
+        if self._writer_error is not None:
+            return None
+        if (self._batch_last_commands is not None
+                and key in self._batch_last_commands):
+            return self._batch_last_commands[key]
+        return self._last_commands.get(key)
+
+    def _write_cached(self, commands: Sequence[bytes],
+                      last_commands: dict) -> None:
+        """ Writes multiple commands (see _write_commands) and remembers them
+        once they have been written (or buffered in the open batch).
+
+        Args:
+            commands: The SCPI commands sent to the instrument (ASCII
+                encoded).
+            last_commands: Dictionary of the commands written by key
+                (command type, channel), as returned by _get_last_command.
+        """
+        try:
+            self._write_commands(commands)
+        except BaseException:
+            # the commands may have been partially written, so the state of
+            # the instrument is unknown for these keys
+            for key in last_commands:
+                self._last_commands.pop(key, None)
+            raise
+
+        if self._batch_last_commands is None:
+            self._last_commands.update(last_commands)
+        else:
+            self._batch_last_commands.update(last_commands)
+
+    def _write_if_changed(self, key: tuple, commands: tuple,
+                          force: bool = False) -> None:
+        """ Writes commands (see _write_commands) only if they are different
+        from the last commands written with the same key.
+
+        Args:
+            key: Tuple representing the command type and the channel it is
+                sent to.
+            commands: Tuple of the SCPI commands sent to the instrument
+                (ASCII encoded).
+            force: Boolean representing whether the commands are written even
+                if they are identical to the last ones (used for the commands
+                that must always reach the instrument, e.g. disabling a
+                channel). They are still remembered as the last commands.
+        """
+        with self._lock:
+            if not force and self._get_last_command(key) == commands:
+                return
+            self._write_cached(commands, {key: commands})
+
+    def invalidate_cache(self) -> None:
+        """ Forgets the last commands written, so that the next command of
+        each type is always sent. Use this if the settings of the instrument
+        have been changed by other means (e.g. from the front panel).
+        """
+        self._last_commands.clear()
+
+    def write_batch(self, commands: Sequence[str]) -> None:
+        """ Writes multiple raw SCPI commands as one compound message (one
+        USB transaction). Keep in mind that the commands written this way
+        are not seen by the cache used to skip repeated commands, so call
+        invalidate_cache if they change the channel settings.
+
+        Args:
+            commands: The SCPI commands sent to the instrument (joined by
+                ';' into a single USB transaction, or written one by one if
+                use_batched is False).
+        """
+        if not commands:
+            return
+        self._write_commands([command.encode('ascii')
+                              for command in commands])
+
+    def _query(self, command: str) -> None:
+        """ Queues a query for the instrument. The query is not sent until
+        flush_queries is called, so the client methods never block waiting
+        for a response. Nothing is queued if debug logging is disabled.
+
+        Args:
+            command: The SCPI query sent to the instrument.
+        """
+        if log.isEnabledFor(logging.DEBUG):
+            self._pending_queries.append(command)
+
+    def flush_queries(self) -> str | None:
+        """ Sends all the pending queries (queued by the client methods in
+        query_mode) as one SCPI compound query (or one by one if use_batched
+        is False) and logs the response.
+
+        Returns:
+            The response of the instrument (the responses to each query are
+            separated by ';') or None if there were no pending queries.
+        """
+        with self._lock:
+            if not self._pending_queries:
+                return None
+
+            if self.use_batched:
+                commands = [';'.join(self._pending_queries)]
+            else:
+                commands = self._pending_queries
+            self._pending_queries = []
+            # the queries must only be sent after all the pending writes
+            self.sync()
+            response = ';'.join(self._query_now(command)
+                                for command in commands)
+            log.debug('%s', response)
+
+            return response
+
+    def wait_complete(self) -> None:
+        """ Waits until the instrument has processed all the commands sent
+        so far, using a single *OPC? query. The instrument parses the
+        commands of a compound message (and consecutive messages) in order,
+        so one query at the end of a sequence of writes is enough to know
+        that all of them have been executed.
+        """
+        with self._lock:
+            # the query must only be sent after all the pending writes
+            self.sync()
+            self._query_now('*OPC?')
+
+    def _query_now(self, command: str) -> str:
+        """ Sends a query straight away (see flush_queries), waiting for the
+        response via a service request if use_srq is enabled.
+
+        Args:
+            command: The SCPI query sent to the instrument.
+
+        Returns:
+            The response of the instrument.
+        """
+        if self._use_srq:
+            return self._query_srq(command)
+        return self.instrument.query(command)
+
+    @contextmanager
+    def batch(self):
+        """ Context manager used to coalesce all the commands sent inside it
+        into one SCPI compound message written on exit.
+
+        Nested batches are merged into the outermost one.
+        """
+        # the batch is not shared with the commands sent by other threads
+        with self._lock:
+            # nested batches are flushed by the outermost one
+            if self._batch_commands is not None:
+                yield self
+                return
+
+            self._batch_commands = []
+            self._batch_last_commands = {}
+            try:
+                # the buffered commands are never written if the body raises,
+                # so the commands they contain are simply forgotten
+                yield self
+                commands = self._batch_commands
+                last_commands = self._batch_last_commands
+            finally:
+                self._batch_commands = None
+                self._batch_last_commands = None
+
+            # write all the buffered commands in one transaction
+            if not commands:
+                return
+            try:
+                self._send_commands(commands)
+            except BaseException:
+                # the batch may have been partially written, so the state of
+                # the instrument is unknown
+                self.invalidate_cache()
+                raise
+            self._last_commands.update(last_commands)
 
     def set_channel_mode(self, channel: str = 'C1', mode: str = 'ON',
                          load: int | str = 75, polarisation: str = 'NOR',
@@ -64,16 +572,45 @@ class BKCom:
             polarisation: Polarisation of the output signal (normal 'NOR' or
                 inverted 'INVT').
             query_mode: Boolean representing whether you want to query the
-                instrument after the command sent and print the response
+                instrument after the command sent. The query is only sent
+                (and the response logged) when flush_queries is called
                 (used only for debugging).
         """
         # send the serial command to enable CH1
-        self.instrument.write(f'{channel}:OUTP {mode},LOAD,{load},PLRT,'
-                              f'{polarisation}')
+        key = (channel, mode, load, polarisation)
+        command = self._outp_commands.get(key)
+        if command is None:
+            command = _OUTP_TEMPLATE(
+                channel=channel, mode=mode, load=load,
+                polarisation=polarisation).encode('ascii')
+            self._outp_commands[key] = command
+        # disabling a channel is always written (even if it seems to be
+        # disabled already), so the output is never left on by mistake
+        self._write_if_changed(('OUTP', channel), (command,),
+                               force=mode.upper() == 'OFF')
 
         # query the instrument if necessary
         if query_mode:
-            print(self.instrument.query(f'{channel}:OUTP?'))
+            self._query(f'{channel}:OUTP?')
+
+    def enable(self, channel: str = 'C1', load: int | str = 75) -> None:
+        """ Enables a channel to send output signals (see set_channel_mode).
+
+        Args:
+            channel: The channel enabled (C1 or C2).
+            load: Load (measured in Ohms).
+        """
+        self.set_channel_mode(channel=channel, mode='ON', load=load)
+
+    def disable(self, channel: str = 'C1', load: int | str = 75) -> None:
+        """ Disables a channel from sending output signals (see
+        set_channel_mode).
+
+        Args:
+            channel: The channel disabled (C1 or C2).
+            load: Load (measured in Ohms).
+        """
+        self.set_channel_mode(channel=channel, mode='OFF', load=load)
 
     def send_waveform(self, channel: str = 'C1', waveform_type: str = 'SINE',
                       waveform_frequency: float = 1000,
@@ -94,19 +631,95 @@ class BKCom:
                 have (in V).
             waveform_width: The width the waveform can have (in s).
             query_mode: Boolean representing whether you want to query the
-                instrument after the command sent and print the response
+                instrument after the command sent. The query is only sent
+                (and the response logged) when flush_queries is called
                 (used only for debugging).
         """
         # send the serial command to send a specific waveform
-        self.instrument.write(
-            f'{channel}:BaSic_WaVe WVTP,{waveform_type},FRQ,'
-            f'{waveform_frequency}HZ,AMP,{waveform_amplitude}V,'
-            f'OFST,{waveform_offset}V,MAX_OUTPUT_AMP,'
-            f'{waveform_max_amplitude}V,WIDTH,{waveform_width}')
+        self._write_if_changed(('WAVE', channel), (self._format_waveform(
+            channel=channel, waveform_type=waveform_type,
+            waveform_frequency=waveform_frequency,
+            waveform_offset=waveform_offset,
+            waveform_amplitude=waveform_amplitude,
+            waveform_max_amplitude=waveform_max_amplitude,
+            waveform_width=waveform_width).encode('ascii'),))
 
         # query the instrument if necessary
         if query_mode:
-            print(self.instrument.query(f'{channel}:BaSic_WaVe?'))
+            self._query(f'{channel}:BaSic_WaVe?')
+
+    def _format_waveform(self, channel: str = 'C1',
+                         waveform_type: str = 'SINE',
+                         waveform_frequency: float = 1000,
+                         waveform_offset: float = 0,
+                         waveform_amplitude: float = 5,
+                         waveform_max_amplitude: float = 5,
+                         waveform_width: float = 1) -> str:
+        """ Formats the SCPI command of a waveform (the arguments and their
+        default values are the same as for send_waveform).
+
+        Returns:
+            String representing the SCPI command.
+        """
+        return _WAVE_TEMPLATE(channel=channel,
+                              waveform_type=waveform_type,
+                              frequency=waveform_frequency,
+                              amplitude=waveform_amplitude,
+                              offset=waveform_offset,
+                              max_amplitude=waveform_max_amplitude,
+                              width=waveform_width)
+
+    def send_waveform_many(self, waveforms: Sequence[dict],
+                           max_message_length: int = 4096) -> None:
+        """ Sends multiple waveforms in as few USB transactions as possible
+        (the waveform commands are joined into SCPI compound messages, unless
+        use_batched is False).
+
+        Args:
+            waveforms: Sequence of dictionaries containing the arguments of
+                send_waveform (channel, waveform_type, waveform_frequency,
+                etc.) for each waveform. Missing arguments take the same
+                default values as for send_waveform.
+            max_message_length: The maximum length (in bytes) of one
+                compound message, including the separators and the
+                termination. Long sequences of waveforms are split into
+                multiple messages so that the input buffer of the instrument
+                is never overrun.
+        """
+        with self._lock:
+            # the commands of the current message, its length (as a compound
+            # message) and its commands by key
+            message = []
+            message_length = 0
+            last_commands = {}
+            for waveform in waveforms:
+                command = (self._format_waveform(**waveform).encode('ascii'),)
+
+                # skip the waveforms already set on the channel (or in the
+                # current message)
+                key = ('WAVE', waveform.get('channel', 'C1'))
+                last_command = last_commands.get(
+                    key, self._get_last_command(key))
+                if last_command == command:
+                    continue
+
+                # write the current message if the command does not fit in it
+                # (with the ';' separator and the termination of the message)
+                if message and (message_length + 1 + len(command[0])
+                                + len(self._TERMINATION)
+                                > max_message_length):
+                    self._write_cached(message, last_commands)
+                    message = []
+                    message_length = 0
+                    last_commands = {}
+
+                message.append(command[0])
+                message_length += (len(command[0])
+                                   + (1 if message_length else 0))
+                last_commands[key] = command
+
+            if message:
+                self._write_cached(message, last_commands)
 
     def set_digital_modulation(self, channel: str = 'C1',
                                modulation_mode: str = 'ON',
@@ -137,24 +750,30 @@ class BKCom:
                 (0-360 degrees).
             modulation_amplitude: Amplitude of the modulation (in V).
             query_mode: Boolean representing whether you want to query the
-                instrument after the command sent and print the response
+                instrument after the command sent. The query is only sent
+                (and the response logged) when flush_queries is called
                 (used only for debugging).
         """
-        # set the modulation mode
-        self.instrument.write(f'{channel}:MDWV STATE,{modulation_mode}')
-
-        # set the parameters for the modulation signal
-        self.instrument.write(f'{channel}:MDWV {modulation_type},MDSP,'
-                              f'{modulation_wave_shape},SRC,'
-                              f'{modulation_source},FRQ,{modulation_frequency}'
-                              f',AMP,{modulation_amplitude}V'
-                              f'HZ,DEPTH,{modulation_depth},DEVI,'
-                              f'{modulation_deviation}'
-                              f'WIDTH,2')
+        # set the modulation mode and the parameters for the modulation
+        # signal in one compound message (see use_batched)
+        commands = (_MDWV_STATE_TEMPLATE(channel=channel,
+                                         mode=modulation_mode),
+                    _MDWV_TEMPLATE(channel=channel,
+                                   modulation_type=modulation_type,
+                                   wave_shape=modulation_wave_shape,
+                                   source=modulation_source,
+                                   frequency=modulation_frequency,
+                                   amplitude=modulation_amplitude,
+                                   depth=modulation_depth,
+                                   deviation=modulation_deviation))
+
+        self._write_if_changed(('MDWV', channel),
+                               tuple(command.encode('ascii')
+                                     for command in commands))
 
         # query the instrument if necessary
         if query_mode:
-            print(self.instrument.query(f'{channel}:MDWV?'))
+            self._query(f'{channel}:MDWV?')
 
     def send_burst(self, channel: str = 'C1',
                    burst_mode: str = 'ON',
@@ -180,19 +799,21 @@ class BKCom:
             burst_wave_amplitude: The amplitude of the signal sent (in V).
             burst_wave_offset: The offset of the signal sent (in V).
             query_mode: Boolean representing whether you want to query the
-                instrument after the command sent and print the response
+                instrument after the command sent. The query is only sent
+                (and the response logged) when flush_queries is called
                 (used only for debugging).
         """
         # send the burst signal
-        self.instrument.write(f'{channel}:BTWV STATE,{burst_mode},'
-                              f'PRD,{burst_period},TRSR,{burst_source},'
-                              f'TIME,{burst_cycles},GATE_NCYC,NCYC,CARR,WVTP,'
-                              f'{burst_wave_carrier},AMP,'
-                              f'{burst_wave_amplitude}V,OFST,'
-                              f'{burst_wave_offset}V')
+        self._write(_BTWV_TEMPLATE(channel=channel, mode=burst_mode,
+                                   period=burst_period,
+                                   source=burst_source,
+                                   cycles=burst_cycles,
+                                   carrier=burst_wave_carrier,
+                                   amplitude=burst_wave_amplitude,
+                                   offset=burst_wave_offset))
 
         if query_mode:
-            print(self.instrument.query('C1:BTWV?'))
+            self._query('C1:BTWV?')
 
     def send_constant_signal(self, analog_amplitude: float = 1.0,
                              digital_amplitude: float = 5.0) -> None:
@@ -204,21 +825,60 @@ class BKCom:
             digital_amplitude: The amplitude of the digital channel (C1 in
                 this case) measured in V. Must be less than 10V.
         """
-        # set the channels mode to ON
-        self.set_channel_mode(channel='C2', mode='ON', load='HZ')
-        self.set_channel_mode(channel='C1', mode='ON', load='HZ')
-
-        # set the waveform of Analog to DC and the waveform of digital to PULSE
-        self.send_waveform(channel='C2', waveform_type='DC',
-                           waveform_offset=analog_amplitude,
-                           waveform_max_amplitude=10)
-        self.send_waveform(channel='C1', waveform_type='DC',
-                           waveform_offset=digital_amplitude,
-                           waveform_max_amplitude=10)
-
+        # all the commands are sent as one compound message
+        with self.batch():
+            # set the channels mode to ON
+            self.set_channel_mode(channel='C2', mode='ON', load='HZ')
+            self.set_channel_mode(channel='C1', mode='ON', load='HZ')
+
+            # set the waveform of Analog to DC and the waveform of digital to
+            # DC
+            self.send_waveform(channel='C2', waveform_type='DC',
+                               waveform_offset=analog_amplitude,
+                               waveform_max_amplitude=10)
+            self.send_waveform(channel='C1', waveform_type='DC',
+                               waveform_offset=digital_amplitude,
+                               waveform_max_amplitude=10)
+
+            # set both channels mode to OFF
+            self.set_channel_mode(channel='C1', mode='OFF', load='HZ')
+            self.set_channel_mode(channel='C2', mode='OFF', load='HZ')
+
+    def _send_pulse_setup(self, analog_amplitude: float,
+                          digital_amplitude: float,
+                          pulse_width: float) -> None:
+        """ Enables both channels and arms the burst of a pulse (see
+        send_pulse), waiting until all the commands have been written.
+        """
+        # all the setup commands are sent as one compound message
+        with self.batch():
+            # set the channels mode to ON
+            self.set_channel_mode(channel='C2', mode='ON', load='HZ')
+            self.set_channel_mode(channel='C1', mode='ON', load='HZ')
+
+            # set the waveform of Analog to DC and the waveform of digital to
+            # PULSE
+            self.send_waveform(channel='C2', waveform_type='DC',
+                               waveform_offset=analog_amplitude,
+                               waveform_max_amplitude=10)
+            self.send_waveform(channel='C1', waveform_type='PULSE',
+                               waveform_amplitude=digital_amplitude,
+                               waveform_max_amplitude=10, waveform_frequency=1,
+                               waveform_width=pulse_width)
+
+            # set the digital channel to burst mode (send only shot)
+            self.send_burst(channel='C1', burst_wave_carrier='PULSE',
+                            burst_wave_amplitude=5, burst_period=1.5)
+
+        # the dwell must start once the burst has actually been written
+        self.sync()
+
+    def _send_pulse_teardown(self) -> None:
+        """ Disables both channels after a pulse (see send_pulse). """
         # set both channels mode to OFF
-        self.set_channel_mode(channel='C1', mode='OFF', load='HZ')
-        self.set_channel_mode(channel='C2', mode='OFF', load='HZ')
+        with self.batch():
+            self.set_channel_mode(channel='C1', mode='OFF', load='HZ')
+            self.set_channel_mode(channel='C2', mode='OFF', load='HZ')
 
     def send_pulse(self, analog_amplitude: float = 1.0,
                    digital_amplitude: float = 5.0,
@@ -232,35 +892,44 @@ class BKCom:
                 this case) measured in V. Must be less than 10V
             pulse_width: Duration of the pulse (measured in s)
         """
-        # set the channels mode to ON
-        self.set_channel_mode(channel='C2', mode='ON', load='HZ')
-        self.set_channel_mode(channel='C1', mode='ON', load='HZ')
+        self._send_pulse_setup(analog_amplitude, digital_amplitude,
+                               pulse_width)
 
-        # set the waveform of Analog to DC and the waveform of digital to PULSE
-        self.send_waveform(channel='C2', waveform_type='DC',
-                           waveform_offset=analog_amplitude,
-                           waveform_max_amplitude=10)
-        self.send_waveform(channel='C1', waveform_type='PULSE',
-                           waveform_amplitude=digital_amplitude,
-                           waveform_max_amplitude=10, waveform_frequency=1,
-                           waveform_width=pulse_width)
+        # delay for 2 seconds (enough time to send one pulse)
+        time.sleep(2)
+
+        self._send_pulse_teardown()
 
-        # set the digital channel to burst mode (send only shot)
-        self.send_burst(channel='C1', burst_wave_carrier='PULSE',
-                        burst_wave_amplitude=5, burst_period=1.5)
+    async def send_pulse_async(self, analog_amplitude: float = 1.0,
+                               digital_amplitude: float = 5.0,
+                               pulse_width: float = 1E4) -> None:
+        """ Coroutine version of send_pulse. The VISA writes are run in the
+        default executor and the 2 s dwell does not block the event loop, so
+        the caller can do other work (e.g. talk to other instruments) while
+        the pulse is sent. Do not use this client object from other tasks
+        until the coroutine is complete.
+
+        Args:
+            analog_amplitude: The amplitude of the analog channel (C2 in
+                this case) measured in V. Must be less than 10V.
+            digital_amplitude: The amplitude of the digital channel (C1 in
+                this case) measured in V. Must be less than 10V
+            pulse_width: Duration of the pulse (measured in s)
+        """
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._send_pulse_setup,
+                                   analog_amplitude, digital_amplitude,
+                                   pulse_width)
 
         # delay for 2 seconds (enough time to send one pulse)
-        time.sleep(2)
+        await asyncio.sleep(2)
 
-        # set both channels mode to OFF
-        self.set_channel_mode(channel='C1', mode='OFF', load='HZ')
-        self.set_channel_mode(channel='C2', mode='OFF', load='HZ')
+        await loop.run_in_executor(None, self._send_pulse_teardown)
 
 
 if __name__ == '__main__':
     # used only for debugging and testing
-    debug_bk_com = BKCom('USB0::0xF4EC::0xEE38::574B21101::INSTR')
-
-    # send a pulse of duration 1E-4
-    debug_bk_com.send_pulse(analog_amplitude=1.4, digital_amplitude=5,
-                            pulse_width=1E-4)
+    with BKCom('USB0::0xF4EC::0xEE38::574B21101::INSTR') as debug_bk_com:
+        # send a pulse of duration 1E-4
+        debug_bk_com.send_pulse(analog_amplitude=1.4, digital_amplitude=5,
+                                pulse_width=1E-4)
@@ -5,15 +5,203 @@ setup and check which ones correspond to the correct external lab equipment
 (or also called instruments).
 
 
-Last update: 14 August 2023
+Last update: 14 October 2026
 """
 
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import functools
+import time
+from typing import Iterator
 import pyvisa
 from pylablib.devices import Thorlabs
 
+# resource manager shared by all the functions (and client objects) of the
+# package, created the first time it is needed by get_resource_manager
+_resource_manager = None
 
-def find_available_visa_instruments(show_instruments_response: bool = False) \
-        -> list:
+
+def get_resource_manager() -> pyvisa.ResourceManager:
+    """ Returns the pyvisa.ResourceManager shared by the whole package.
+
+    Creating a resource manager loads the VISA backend and rescans the
+    buses, so it is only done once (the first time this function is called).
+
+    Returns:
+        The shared pyvisa.ResourceManager.
+    """
+    global _resource_manager
+    if _resource_manager is None:
+        _resource_manager = pyvisa.ResourceManager()
+    return _resource_manager
+
+
+# (time, resources) of the last resources listing (see
+# _cached_list_resources)
+_list_resources_cache = (None, ())
+
+
+def _cached_list_resources(ttl: float = 5.0) -> tuple:
+    """ Lists the resources available to the shared resource manager,
+    reusing the last listing if it is more recent than ttl seconds (e.g.
+    when multiple client objects are constructed one after the other).
+
+    Args:
+        ttl: The time (measured in s) a listing of the resources is reused.
+
+    Returns:
+        Tuple of the resources available.
+    """
+    global _list_resources_cache
+    listing_time, resources = _list_resources_cache
+    now = time.monotonic()
+    if listing_time is None or now - listing_time > ttl:
+        resources = tuple(get_resource_manager().list_resources())
+        _list_resources_cache = (now, resources)
+    return resources
+
+
+# timeouts (measured in ms) used when probing the resources, short so that
+# unresponsive resources fail fast instead of stalling the scan
+_PROBE_OPEN_TIMEOUT = 500
+_PROBE_TIMEOUT = 300
+
+# maximum number of resources probed at the same time
+_MAX_PROBE_WORKERS = 8
+
+# interfaces probed by default (serial ports are skipped as opening each one
+# and waiting for the '*IDN?' timeout is very slow and they rarely are
+# instruments)
+DEFAULT_INTERFACES = ('USB', 'TCPIP', 'GPIB')
+
+
+def _probe(resource: str) -> tuple:
+    """ Opens a resource, queries its identity and closes it again.
+
+    Args:
+        resource: String representing the resource (as found by pyvisa).
+
+    Returns:
+        Tuple of the resource and its response to the '*IDN?' query.
+    """
+    instrument = get_resource_manager().open_resource(
+        resource, open_timeout=_PROBE_OPEN_TIMEOUT)
+    try:
+        instrument.timeout = _PROBE_TIMEOUT
+        identity = instrument.query('*IDN?')
+    finally:
+        # close the probed session so it does not hold the resource
+        instrument.close()
+
+    return resource, identity
+
+
+def iter_visa_instrument_identities(
+        show_instruments_response: bool = False,
+        interfaces: tuple | None = DEFAULT_INTERFACES) -> Iterator[tuple]:
+    """ Lazily finds the available instruments connected to the local
+    machine together with their response to the '*IDN?' query.
+
+    The resources are probed concurrently and each instrument is yielded as
+    soon as it responds, so the caller can stop the scan (and cancel the
+    probes not started yet) once it found what it needs.
+
+    Args:
+        show_instruments_response: Boolean representing whether to show the
+            instruments resource and their response to the '*idn?' query.
+        interfaces: Tuple of the resource prefixes (e.g. 'USB', 'ASRL')
+            representing the interfaces probed. If None is given, all the
+            resources are probed.
+
+    Yields:
+        (resource, identity) tuples for the available resources representing
+        instruments communicating through visa, in the order they respond.
+    """
+    yield from _iter_identities(
+        resources=_cached_list_resources(),
+        show_instruments_response=show_instruments_response,
+        interfaces=interfaces)
+
+
+def _iter_identities(resources: tuple, show_instruments_response: bool,
+                     interfaces: tuple | None) -> Iterator[tuple]:
+    """ Probes the given resources (see iter_visa_instrument_identities).
+
+    Args:
+        resources: Tuple of the resources listed by pyvisa.
+        show_instruments_response: Boolean representing whether to show the
+            instruments resource and their response to the '*idn?' query.
+        interfaces: Tuple of the resource prefixes representing the
+            interfaces probed (all the resources are probed if None).
+
+    Yields:
+        (resource, identity) tuples, in the order the resources respond.
+    """
+    resources = [resource for resource in resources
+                 if interfaces is None or resource.startswith(interfaces)]
+    if not resources:
+        return
+
+    # probe all the resources concurrently (the probes are I/O bound, so
+    # the scan takes as long as the slowest probe instead of their sum)
+    executor = ThreadPoolExecutor(max_workers=min(_MAX_PROBE_WORKERS,
+                                                  len(resources)))
+    try:
+        futures = {executor.submit(_probe, resource): resource
+                   for resource in resources}
+        for future in as_completed(futures):
+            resource = futures[future]
+            try:
+                identity = future.result()[1]
+            except Exception as ex:
+                if show_instruments_response:
+                    print('Resource: ', resource, ' is not an instrument or '
+                          'the local machine is not able to connect to it.')
+                    print('ERROR RETURNED:', ex)
+                    # leave a blank line after printing the error
+                    print()
+                continue
+
+            if show_instruments_response:
+                print('Resource:', resource, ' corresponds to instrument: ',
+                      identity)
+            yield resource, identity
+    finally:
+        # do not wait for (or start) the probes left if the caller stopped
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def find_visa_instrument_identities(
+        show_instruments_response: bool = False,
+        interfaces: tuple | None = DEFAULT_INTERFACES) -> list:
+    """ Finds all the available instruments connected to the local machine
+    together with their response to the '*IDN?' query.
+
+    Keep in mind that only instruments that can  communicate through the visa
+    protocol are shown.
+
+    Args:
+        show_instruments_response: Boolean representing whether to show the
+            instruments resource and their response to the '*idn?' query.
+        interfaces: Tuple of the resource prefixes representing the
+            interfaces probed (see iter_visa_instrument_identities).
+
+    Returns:
+        List of (resource, identity) tuples for all the available resources
+        representing instruments communicating through visa (in the order
+        the resources are listed by pyvisa).
+    """
+    # one listing is used both for probing and sorting, so a resource
+    # appearing in between (once the listing expires) can not be missing
+    resources = _cached_list_resources()
+    return sorted(_iter_identities(
+        resources=resources,
+        show_instruments_response=show_instruments_response,
+        interfaces=interfaces), key=lambda pair: resources.index(pair[0]))
+
+
+def find_available_visa_instruments(
+        show_instruments_response: bool = False,
+        interfaces: tuple | None = DEFAULT_INTERFACES) -> list:
     """ Finds  all the available instruments connected to the local machine.
 
     Keep in mind that only instruments that can  communicate through the visa
@@ -22,35 +210,84 @@ def find_available_visa_instruments(show_instruments_response: bool = False) \
     Args:
         show_instruments_response: Boolean representing whether to show the
             instruments resource and their response to the '*idn?' query.
+        interfaces: Tuple of the resource prefixes representing the
+            interfaces probed (see find_visa_instrument_identities).
 
     Returns:
         List of all the available resources representing instruments
         communicating through visa.
     """
-    # list of resources representing available instruments
-    available_instruments = []
-
-    # go through all available resources and print their identity
-    for resource in pyvisa.ResourceManager().list_resources():
-        # try to open each resource and send a query message for identification
-        try:
-            instrument = pyvisa.ResourceManager().open_resource(resource)
-            identity = instrument.query('*IDN?')
-            if show_instruments_response:
-                print('Resource:', resource, ' corresponds to instrument: ',
-                      identity)
-            available_instruments.append(resource)
+    return [resource for resource, _ in find_visa_instrument_identities(
+        show_instruments_response=show_instruments_response,
+        interfaces=interfaces)]
 
-        except Exception as ex:
-            if show_instruments_response:
-                print('Resource: ', resource, ' is not an instrument or the '
-                      'local machine is not able to connect to it.')
-                print('ERROR RETURNED:', ex)
-                # leave a blank line after printing the error
-                print()
 
-    # return the available instruments found
-    return available_instruments
+def _is_bk_precision_4063_b(identity: str) -> bool:
+    """ Checks whether a response to the '*IDN?' query corresponds to a BK
+    Precision 4063B.
+
+    Args:
+        identity: The response of the instrument to the '*IDN?' query.
+
+    Returns:
+        Boolean representing whether the instrument is a BK 4063B.
+    """
+    return identity.split(',')[:2] == ['BK', '4063B']
+
+
+def iter_bk_precision_4063_b() -> Iterator[str]:
+    """ Lazily finds the available BK Precision 4063B instruments (see
+    iter_visa_instrument_identities).
+
+    Yields:
+        The resources representing available BK Precision 4063B
+        instruments, in the order they respond.
+    """
+    # check which available instruments are BK 4063B (using the identities
+    # found during the scan, so each instrument is only queried once). The
+    # BK 4063B is only used through USB, so only USB resources are probed.
+    for resource, identity in iter_visa_instrument_identities(
+            interfaces=('USB',)):
+        if _is_bk_precision_4063_b(identity):
+            yield resource
+
+
+def find_first_bk_precision_4063_b() -> str | None:
+    """ Finds the first available BK Precision 4063B (in the order the
+    resources are listed by pyvisa), so the same instrument is always chosen
+    when multiple ones are connected.
+
+    The USB resources are probed concurrently, but the scan stops as soon as
+    every resource listed before a BK 4063B has answered (or failed) instead
+    of waiting for all of them.
+
+    Returns:
+        The resource representing the first available BK Precision 4063B, or
+        None if none was found.
+    """
+    # the BK 4063B is only used through USB (see iter_bk_precision_4063_b)
+    resources = [resource for resource in _cached_list_resources()
+                 if resource.startswith('USB')]
+    if not resources:
+        return None
+
+    executor = ThreadPoolExecutor(max_workers=min(_MAX_PROBE_WORKERS,
+                                                  len(resources)))
+    try:
+        futures = [executor.submit(_probe, resource)
+                   for resource in resources]
+        # wait for the probes in the listing order
+        for resource, future in zip(resources, futures):
+            try:
+                identity = future.result()[1]
+            except Exception:
+                continue
+            if _is_bk_precision_4063_b(identity):
+                return resource
+        return None
+    finally:
+        # do not wait for (or start) the probes left
+        executor.shutdown(wait=False, cancel_futures=True)
 
 
 def find_available_bk_precision_4063_b() -> list:
@@ -60,15 +297,11 @@ def find_available_bk_precision_4063_b() -> list:
         List of the resources representing available BK Precision 4063B
         instruments.
     """
-    # all the BK 4063B instruments found
-    available_bk_precision_4063_b = []
-
-    # check which available instruments are BK 4063B
-    for resource in find_available_visa_instruments():
-        instrument = pyvisa.ResourceManager().open_resource(resource)
-        identity_split = instrument.query('*IDN?').split(',')
-        if identity_split[0] == 'BK' and identity_split[1] == '4063B':
-            available_bk_precision_4063_b.append(resource)
+    # all the BK 4063B instruments found (in the order they are listed by
+    # pyvisa), only USB resources are probed (see iter_bk_precision_4063_b)
+    available_bk_precision_4063_b = [
+        resource for resource, identity in find_visa_instrument_identities(
+            interfaces=('USB',)) if _is_bk_precision_4063_b(identity)]
 
     # raise an error if none were found
     if len(available_bk_precision_4063_b) == 0:
@@ -78,31 +311,49 @@ def find_available_bk_precision_4063_b() -> list:
     return available_bk_precision_4063_b
 
 
+@functools.lru_cache(maxsize=1)
+def _list_kinesis() -> tuple:
+    """ Lists all the available kinesis devices. The (slow) USB enumeration
+    is only done once, call invalidate_kdc_101_cache to rescan.
+
+    Returns:
+        Tuple of the (serial number, description) pairs of all the kinesis
+        devices found.
+    """
+    return tuple(Thorlabs.list_kinesis_devices())
+
+
 def find_available_kdc_101() -> list:
     """  Finds all the available ThorLabs KDC101 Brushed Motor Controllers.
 
+    The kinesis devices are only listed the first time this function is
+    called (unless none are found), call invalidate_kdc_101_cache() to scan
+    again (e.g. after connecting a new device).
+
     Returns: List of all the serial numbers of ThorLabs KDC101 Brushed Motor
     Controllers found connected to the local machine.
     """
-    # find all available kinesis devices
-    kinesis_devices = Thorlabs.list_kinesis_devices()
-
-    # empty list to add all the serial numbers for the kdc 101 Motors found
-    kdc_101_serial_numbers = []
+    # check which kinesis devices are KDC 101 Motors
+    kdc_101_serial_numbers = [device[0] for device in _list_kinesis()
+                              if device[1] == 'Brushed Motor Controller']
 
-    # check which one are KDC 101 Motors
-    for device in kinesis_devices:
-        if device[1] == 'Brushed Motor Controller':
-            kdc_101_serial_numbers.append(device[0])
-
-    # raise an error if none were found
+    # raise an error if none were found (scanning again on the next call, as
+    # the motors may not have been connected yet)
     if len(kdc_101_serial_numbers) == 0:
+        invalidate_kdc_101_cache()
         raise Exception('DeviceNotFound')
 
     # return the serials number found
     return kdc_101_serial_numbers
 
 
+def invalidate_kdc_101_cache() -> None:
+    """ Forgets the kinesis devices listed, so that the next call to
+    find_available_kdc_101 scans the USB devices again.
+    """
+    _list_kinesis.cache_clear()
+
+
 if __name__ == '__main__':
     # find_available_visa_instruments(show_instruments_response=True)
     print(find_available_bk_precision_4063_b())
@@ -15,8 +15,11 @@ information: https://pylablib.readthedocs.io/en/latest/devices/Thorlabs_kinesis.
 See the end of the file for a code example.
 
 
-Last update: 28 October 2023.
+Last update: 14 October 2026.
 """  # noqa
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import threading
 import time
 
 from pylablib.devices import Thorlabs
@@ -31,9 +34,20 @@ class KDC101Com:
 
     This Client class can ONLY handle communications through USB via pylablib
     (which uses pyserial in their backend). To move the motor, simply use
-    the move_to_position method. Keep in mind that the values are coming
-    from the internal setup of the motor (they can be accessed via the
-    self.distance_unit attribute).
+    the move_to_position method (or start_move and wait_move to move
+    multiple motors at the same time). Keep in mind that the values are
+    coming from the internal setup of the motor (they can be accessed via
+    the self.distance_unit attribute). The connection to the motor stays
+    open until close is called (or the client object is used as a context
+    manager).
+
+    A move to the same target as the last move commanded is skipped. Call
+    invalidate_position if the motor may have been moved by other means
+    (e.g. jogged from the front panel or stopped before reaching the
+    target), so that the next move is always sent to the motor.
+
+    Call stop (from any thread but the one running the coroutine methods of
+    this motor) to stop the motor, even while a move is being waited for.
 
     Attributes:
         serial_number: String representing the serial number written on the
@@ -46,9 +60,16 @@ class KDC101Com:
             real physical distance the motor has moved (in this case,
             1 distance_unit corresponds to 0.05 mm).
         home_position: Numpy array representing the home position of the
-            device. Initialized as None.
+            device. Initialized as None. Always set it with the home method.
+        low_latency: Boolean representing whether the USB serial port of the
+            motor is set to low latency mode (only supported by the pyserial
+            backend on Linux, ignored otherwise).
+        poll_period: The period (measured in s) at which the status of the
+            motor is checked while waiting for a move to finish.
     """
-    def __init__(self, serial_number: str = None) -> None:
+    def __init__(self, serial_number: str = None,
+                 low_latency: bool = True,
+                 poll_period: float = 0.01) -> None:
         # search for the available KDC101 motors available if None is given
         if serial_number is None:
             self.serial_number = find_available_kdc_101()[0]
@@ -58,16 +79,148 @@ class KDC101Com:
 
         self.motor = Thorlabs.KinesisMotor(self.serial_number)
 
+        # reduce the USB latency of every command/response round trip
+        if low_latency:
+            self._set_low_latency_mode()
+
         # get the distance units from the internal setup of the motor
-        self.distance_unit = (
-            self.motor.get_gen_move_parameters().__getitem__(0))
+        self.distance_unit = self.motor.get_gen_move_parameters()[0]
+
+        # conversion factors between mm and the internal units of the motor
+        # (computed once instead of on every move)
+        self._scale = self.distance_unit*20
+        self._inv_scale = 1.0/self._scale
+
+        # motor methods called on every move, bound only once
+        self._move_to = self.motor.move_to
+        self._get_position = self.motor.get_position
+        self._is_moving = self.motor.is_moving
 
         # the home position of the motor. Initialized as None.
         self.home_position = None
 
+        # the home position in the internal units of the motor (set by home)
+        self._home_scaled = None
+
+        self.poll_period = poll_period
+
+        # the last target (in internal units) the motor was moved to
+        self._last_target = None
+
+        # set by stop to interrupt the move being waited for (see wait_move)
+        self._stop_requested = threading.Event()
+
+        # thread running the blocking calls of the coroutine methods. One
+        # thread per motor keeps the commands sent to this motor in order
+        # and never waits behind the calls made to other devices.
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix=f'KDC101-{self.serial_number}')
+
+    def _set_low_latency_mode(self) -> None:
+        """ Sets the serial port used by pylablib to low latency mode, which
+        removes the (16 ms by default) latency timer of the FTDI USB serial
+        converter from each round trip. Does nothing if this is not supported
+        by the backend or the platform.
+        """
+        backend = self.motor.instr
+        if backend.get_backend_name() != 'serial':
+            return
+        try:
+            backend.instr.set_low_latency_mode(True)
+        except (AttributeError, NotImplementedError, OSError, ValueError):
+            # not available on this platform (e.g. Windows) or port
+            pass
+
+    def close(self) -> None:
+        """ Closes the connection to the motor (after the calls started by
+        the coroutine methods have finished).
+        """
+        self._executor.shutdown(wait=True)
+        self._last_target = None
+        self.motor.close()
+
+    def __enter__(self) -> 'KDC101Com':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
     def get_current_position(self) -> float:
         """ Gets the current position (measured in mm) of the motors."""
-        return self.motor.get_position()/(self.distance_unit*20)
+        return self._get_position()*self._inv_scale
+
+    def start_move(self, position: float) -> None:
+        """ Starts moving the motor to a certain position without waiting for
+        the move to finish (see wait_move), so that multiple motors can be
+        moved at the same time.
+
+        Args:
+            position: The position at which the motor will move (measured in
+                mm). Keep in mind that the position will always be relative to
+                the 0 position of the motor.
+        """
+        self._start_move_units(position*self._scale)
+
+    def _start_move_units(self, units: float) -> None:
+        """ Starts moving the motor to a position given in the internal units
+        of the motor (see start_move).
+
+        Args:
+            units: The position at which the motor will move (measured in
+                the internal units of the motor).
+        """
+        # the motor is only moved by whole internal units, so a move to the
+        # last target commanded is skipped (no USB round trip needed)
+        target = round(units)
+        if target == self._last_target:
+            return
+        try:
+            self._move_to(target)
+        except BaseException:
+            # the move may not have been started
+            self._last_target = None
+            raise
+        # only remembered once the move has been commanded
+        self._last_target = target
+
+    def invalidate_position(self) -> None:
+        """ Forgets the last target the motor was moved to, so that the next
+        move is always sent to the motor. Use this if the motor may have
+        been moved by other means (e.g. from the front panel).
+        """
+        self._last_target = None
+
+    def wait_move(self) -> None:
+        """ Blocks until the motor has stopped moving (or stop is called).
+        The status of the motor is checked every self.poll_period seconds
+        (pylablib checks it every 50 ms by default, which adds up to 50 ms of
+        dead time to every move).
+        """
+        while self._is_moving():
+            # the motor is stopped by the thread running _stop_now, so the
+            # commands sent to the motor never come from two threads at once
+            if self._stop_requested.is_set():
+                self._last_target = None
+                return
+            time.sleep(self.poll_period)
+
+    def stop(self) -> None:
+        """ Stops the motor straight away. If a move is being waited for in
+        the thread of this motor (see move_to_position_async), the wait is
+        interrupted and the stop command is sent from that thread once it is
+        free. Must not be called from the thread of this motor.
+        """
+        self._stop_requested.set()
+        self._executor.submit(self._stop_now).result()
+
+    def _stop_now(self) -> None:
+        """ Sends the stop command to the motor (see stop). """
+        try:
+            self.motor.stop(immediate=True, sync=False)
+        finally:
+            # the motor did not necessarily reach the last target
+            self._last_target = None
+            self._stop_requested.clear()
 
     def move_to_position(self, position: float) -> None:
         """ Moves the motor to a certain position.
@@ -78,11 +231,28 @@ class KDC101Com:
                 the 0 position of the motor.
         """
         # move the motor to the specific position
-        self.motor.move_to(position*self.distance_unit*20)
+        self.start_move(position=position)
 
         # wait until the motor stopped moving
-        while self.motor.is_moving():
-            time.sleep(0.1)
+        try:
+            self.wait_move()
+        except BaseException:
+            # the move may have been stopped before reaching the target
+            self._last_target = None
+            raise
+
+    async def move_to_position_async(self, position: float) -> None:
+        """ Coroutine version of move_to_position. The move is run in the
+        thread of this motor, so other motors (or instruments) can be used
+        while this motor is moving.
+
+        Args:
+            position: The position at which the motor will move (measured in
+                mm). Keep in mind that the position will always be relative to
+                the 0 position of the motor.
+        """
+        await asyncio.get_running_loop().run_in_executor(
+            self._executor, self.move_to_position, position)
 
     def home(self, new_home_position: float = None) -> None:
         """ Homes the device.
@@ -96,6 +266,10 @@ class KDC101Com:
         Raises:
             InvalidHomePosition: If self.home_position is None.
         """
+        # always send the move, even if the home position is the last target
+        # (the motor may have been moved by other means since)
+        self.invalidate_position()
+
         if new_home_position is None:
             # raise error if there is no home position yet
             if self.home_position is None:
@@ -109,8 +283,19 @@ class KDC101Com:
         # change the home position and move to it
         else:
             self.home_position = new_home_position
+            self._home_scaled = self.home_position*self._scale
             self.move_to_position(position=self.home_position)
 
+    async def home_async(self, new_home_position: float = None) -> None:
+        """ Coroutine version of home (run in the thread of this motor).
+
+        Args:
+            new_home_position: The new home position for the device (see
+                home).
+        """
+        await asyncio.get_running_loop().run_in_executor(
+            self._executor, self.home, new_home_position)
+
     def move_relative(self, relative_distance: float) -> None:
         """ Move a relative position from home.
 
@@ -127,8 +312,14 @@ class KDC101Com:
             raise Exception('InvalidHomePosition')
 
         else:
-            self.move_to_position(
-                position=self.home_position+relative_distance)
+            self._start_move_units(
+                self._home_scaled + relative_distance*self._scale)
+            try:
+                self.wait_move()
+            except BaseException:
+                # the move may have been stopped before reaching the target
+                self._last_target = None
+                raise
 
 
 if __name__ == '__main__':
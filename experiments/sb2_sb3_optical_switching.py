@@ -10,14 +10,68 @@ https://onlinelibrary.wiley.com/doi/full/10.1002/adfm.202002447.
 See the end of the file for a code example.
 
 
-Last update: 28 October 2023.
+Last update: 14 October 2026.
 """
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import functools
+import logging
+import multiprocessing as mp
+import queue
+import threading
 import time
 import numpy as np
+from matplotlib import pyplot as plt
 from coms.thorlabs_kdc_101 import KDC101Com
 from coms.bk_precision_4063_b import BKCom
 from coms.find_resources import find_available_kdc_101
-from utils import get_soton_pattern, plot_pixel_pattern
+from utils import get_soton_pattern, LivePixelPattern
+
+log = logging.getLogger(__name__)
+
+
+def _plot_worker(plot_queue: mp.Queue, start_pixel: np.ndarray | list,
+                 n_pixels: int, pixel_length: float) -> None:
+    """ Shows the pixels written so far in a separate process, so that the
+    rendering of the figure does not delay the experiment loop. Only the
+    latest snapshot in the queue is drawn (older ones are dropped). Once None
+    is received, the figure is kept open (showing the last snapshot) until
+    it is closed.
+
+    Args:
+        plot_queue: Queue holding (points, title) snapshots.
+        start_pixel: The start pixel given to utils.LivePixelPattern.
+        n_pixels: The number of pixels given to utils.LivePixelPattern.
+        pixel_length: The pixel length given to utils.LivePixelPattern.
+    """
+    live_plot = LivePixelPattern(start_pixel=start_pixel, n_pixels=n_pixels,
+                                 pixel_length=pixel_length)
+    while True:
+        try:
+            snapshot = plot_queue.get(timeout=0.1)
+        except queue.Empty:
+            # keep the window responsive while waiting for new pixels
+            live_plot.figure.canvas.flush_events()
+            continue
+
+        # drain the stale snapshots and keep only the latest one
+        stop = snapshot is None
+        try:
+            while not stop:
+                newer_snapshot = plot_queue.get_nowait()
+                if newer_snapshot is None:
+                    stop = True
+                else:
+                    snapshot = newer_snapshot
+        except queue.Empty:
+            pass
+        if snapshot is not None:
+            live_plot.update(points=snapshot[0], title=snapshot[1])
+        if stop:
+            break
+
+    # keep showing the final pixel map until the figure is closed
+    plt.show(block=True)
 
 
 class Sb2Sb3ExperimentControl:
@@ -34,6 +88,13 @@ class Sb2Sb3ExperimentControl:
     available. Keep in Mind that this is not recommended as multiple devices
     might be connected in the same time.
 
+    The connections to the lab equipment are opened only once and kept open
+    until close is called (or the object is used as a context manager):
+
+        with Sb2Sb3ExperimentControl() as experiment_control:
+            experiment_control.calibrate()
+            experiment_control.run_experiment()
+
     Attributes:
         bk_4063b_address: String representing the address (visa resource) of
             the BK Precision 4063B BNC.
@@ -49,20 +110,47 @@ class Sb2Sb3ExperimentControl:
         y_motor: KD101Com client object used to communicated with the
             physical brushed motor ThorLabs Kinesis KD101 used to control the
             y movement.
+        bnc_timeout: Integer representing the VISA timeout (measured in ms)
+            used for the BK Precision 4063B BNC (the commands sent during
+            the experiment are short, so a failing write is reported
+            quickly).
+        verbose: Boolean representing whether the progress of the
+            experiment (the moves and writes of each pixel) is shown. The
+            messages are logged at INFO level and verbose lowers the level of
+            the logger of this module to INFO (if False, the level is left
+            as configured by the application). No handler is installed
+            here: the application must configure the logging handlers (e.g.
+            with logging.basicConfig), otherwise the messages are not shown.
     """
 
+    # the attributes are fixed, so no instance __dict__ is needed
+    __slots__ = ('bk_4063b_address', 'x_kdc101_address', 'y_kdc101_address',
+                 'bnc', 'x_motor', 'y_motor', 'bnc_timeout', 'verbose')
+
     def __init__(self, bk_4063b_address: str = None,
                  x_kdc101_address: str = None,
-                 y_kdc101_address: str = None) -> None:
+                 y_kdc101_address: str = None,
+                 bnc_timeout: int = 500,
+                 verbose: bool = False) -> None:
 
         self.bk_4063b_address = bk_4063b_address
+        self.bnc_timeout = bnc_timeout
+
+        # show the progress messages only if asked for
+        self.verbose = verbose
+        if verbose:
+            log.setLevel(logging.INFO)
 
         # as there are two motors, automatically searching for the first one
         # might make the code confuse the two motors. If one of them is None
         # manually search for two different available motors.
         if x_kdc101_address is None or y_kdc101_address is None:
-            self.x_kdc101_address = find_available_kdc_101()[0]
-            self.y_kdc101_address = find_available_kdc_101()[1]
+            kdc101_serial_numbers = find_available_kdc_101()
+            if len(kdc101_serial_numbers) < 2:
+                raise Exception('DeviceNotFound: two KDC101 motors are '
+                                f'needed, found: {kdc101_serial_numbers}')
+            self.x_kdc101_address = kdc101_serial_numbers[0]
+            self.y_kdc101_address = kdc101_serial_numbers[1]
 
         # else use the user given addresses
         else:
@@ -70,9 +158,142 @@ class Sb2Sb3ExperimentControl:
             self.y_kdc101_address = y_kdc101_address
 
         # set up the client object for connection
-        self.bnc = BKCom(self.bk_4063b_address)
-        self.x_motor = KDC101Com(self.x_kdc101_address)
-        self.y_motor = KDC101Com(self.y_kdc101_address)
+        for client_name, client in self._open_clients().items():
+            setattr(self, client_name, client)
+
+    def _open_clients(self) -> dict:
+        """ Opens the connections to the BNC and to both motors at the same
+        time (each one mostly waits for the device). If any connection
+        fails, the ones that were opened are closed (they could not be
+        closed otherwise, as the object is never created) and the first
+        error is raised.
+
+        Returns:
+            Dictionary of the client objects, keyed by the attribute name.
+        """
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = {
+                'bnc': executor.submit(BKCom, self.bk_4063b_address,
+                                       timeout=self.bnc_timeout),
+                'x_motor': executor.submit(KDC101Com, self.x_kdc101_address),
+                'y_motor': executor.submit(KDC101Com, self.y_kdc101_address)}
+
+        # collect every client opened (and the first error raised)
+        clients = {}
+        error = None
+        for client_name, future in futures.items():
+            try:
+                clients[client_name] = future.result()
+            except Exception as ex:
+                if error is None:
+                    error = ex
+
+        if error is not None:
+            for client in clients.values():
+                try:
+                    client.close()
+                except Exception:
+                    pass
+            raise error
+
+        return clients
+
+    def close(self) -> None:
+        """ Closes the connections to the BNC and to both motors. Does
+        nothing if they have already been closed.
+        """
+        for client_name in ('bnc', 'x_motor', 'y_motor'):
+            client = getattr(self, client_name, None)
+            if client is not None:
+                setattr(self, client_name, None)
+                client.close()
+
+    def __enter__(self) -> 'Sb2Sb3ExperimentControl':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __del__(self) -> None:
+        # the connections might not have been opened if __init__ failed
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    def _arm_pixel_writer(self, analog_amplitude: float = 5,
+                          digital_amplitude: float = 5,
+                          pulse_duration: float = 0.1, **kwargs) -> None:
+        """ Sets the analog and digital modulation waveforms of the BNC (see
+        _write_on_pixel). The BNC client skips commands identical to the
+        last ones sent, so once the BNC is armed (e.g. before writing a
+        whole pixel map) calling this again sends nothing.
+        """
+        with self.bnc.batch():
+            # set the analog modulation (C2 is set to send a constant DC
+            # signal)
+            self.bnc.send_waveform(channel='C2', waveform_type='DC',
+                                   waveform_amplitude=0,
+                                   waveform_offset=analog_amplitude,
+                                   waveform_max_amplitude=10,
+                                   **kwargs)
+
+            # set the digital modulation (a burst function with a PULSE
+            # signal)
+            # set the PULSE signal
+            self.bnc.send_waveform(channel='C1',
+                                   waveform_type='PULSE',
+                                   waveform_amplitude=digital_amplitude,
+                                   waveform_offset=5,
+                                   waveform_max_amplitude=10,
+                                   waveform_frequency=1,
+                                   waveform_width=pulse_duration,
+                                   **kwargs)
+
+    def _start_writing(self, analog_amplitude: float = 5,
+                       digital_amplitude: float = 5,
+                       pulse_duration: float = 0.1, **kwargs) -> float:
+        """ Enables both channels of the BNC and starts the modulation of the
+        laser (see _write_on_pixel).
+
+        Returns:
+            The time (as given by time.perf_counter) at which the BNC
+            confirmed that the modulation has started.
+        """
+        # enable the output of both channels and set the modulation, all in
+        # one compound message (the waveforms are only included if the BNC
+        # has not been armed with them already)
+        with self.bnc.batch():
+            self.bnc.set_channel_mode(channel='C1', mode='ON', load='HZ',
+                                      **kwargs)
+            self.bnc.set_channel_mode(channel='C2', mode='ON', load='HZ',
+                                      **kwargs)
+            self._arm_pixel_writer(analog_amplitude=analog_amplitude,
+                                   digital_amplitude=digital_amplitude,
+                                   pulse_duration=pulse_duration, **kwargs)
+
+            # send the burst signal
+            self.bnc.send_burst(channel='C1', burst_wave_carrier='PULSE',
+                                burst_wave_amplitude=digital_amplitude,
+                                burst_period=1.5)
+
+        # one *OPC? for the whole ON batch, so that the writing time is only
+        # counted once the modulation has actually started
+        self.bnc.wait_complete()
+        return time.perf_counter()
+
+    def _stop_writing(self, **kwargs) -> None:
+        """ Stops the modulation of the laser (see _write_on_pixel). """
+        # stop the laser modulation
+        with self.bnc.batch():
+            self.bnc.set_channel_mode(channel='C1', mode='OFF', load='HZ',
+                                      **kwargs)
+            self.bnc.set_channel_mode(channel='C2', mode='OFF', load='HZ',
+                                      **kwargs)
+
+        # one *OPC? for the whole OFF batch, so that the motors only move
+        # once the modulation has actually stopped
+        self.bnc.wait_complete()
 
     def _write_on_pixel(self, writing_time: float = 5,
                         analog_amplitude: float = 5,
@@ -102,47 +323,70 @@ class Sb2Sb3ExperimentControl:
                 smaller than writing_time.
             **kwargs: Other arguments given to coms.BKCom client methods.
         """
-        # enable the putput of both channels
-        self.bnc.set_channel_mode(channel='C1', mode='ON', load='HZ', **kwargs)
-        self.bnc.set_channel_mode(channel='C2', mode='ON', load='HZ', **kwargs)
-
-        # set the analog modulation (C2 is set to send a constant DC signal)
-        self.bnc.send_waveform(channel='C2', waveform_type='DC',
-                               waveform_amplitude=0,
-                               waveform_offset=analog_amplitude,
-                               waveform_max_amplitude=10,
-                               **kwargs)
-
-        # set the digital modulation (a burst function with a PULSE signal)
-        # set the PULSE signal
-        self.bnc.send_waveform(channel='C1',
-                               waveform_type='PULSE',
-                               waveform_amplitude=digital_amplitude,
-                               waveform_offset=5,
-                               waveform_max_amplitude=10,
-                               waveform_frequency=1,
-                               waveform_width=pulse_duration,
-                               **kwargs)
-
-        # send the burst signal
-        self.bnc.send_burst(channel='C1', burst_wave_carrier='PULSE',
-                            burst_wave_amplitude=digital_amplitude,
-                            burst_period=1.5)
-
-        # wait for the laser to write on the pixel
-        time.sleep(writing_time)
-
-        # stop the laser modulation
-        self.bnc.set_channel_mode(channel='C1', mode='OFF', load='HZ',
-                                  **kwargs)
-        self.bnc.set_channel_mode(channel='C2', mode='OFF', load='HZ',
-                                  **kwargs)
+        try:
+            start_time = self._start_writing(
+                analog_amplitude=analog_amplitude,
+                digital_amplitude=digital_amplitude,
+                pulse_duration=pulse_duration, **kwargs)
+
+            # wait for the laser to write on the pixel (until a deadline, so
+            # the time spent after the modulation started is not added to it)
+            deadline = start_time + writing_time
+            time.sleep(max(0.0, deadline - time.perf_counter()))
+        finally:
+            # always stop the modulation (e.g. also on KeyboardInterrupt)
+            self._stop_writing(**kwargs)
+
+    async def _write_on_pixel_async(self, writing_time: float = 5,
+                                    analog_amplitude: float = 5,
+                                    digital_amplitude: float = 5,
+                                    pulse_duration: float = 0.1,
+                                    **kwargs) -> None:
+        """ Coroutine version of _write_on_pixel. The BNC commands are sent
+        from the default executor and the event loop is free while the laser
+        writes on the pixel. The modulation is always stopped, even if the
+        coroutine is cancelled (e.g. by a KeyboardInterrupt under
+        asyncio.run).
+        """
+        loop = asyncio.get_running_loop()
+
+        # set once the ON batch has been sent (or has failed)
+        started = threading.Event()
+
+        def start_writing() -> float:
+            try:
+                return self._start_writing(
+                    analog_amplitude=analog_amplitude,
+                    digital_amplitude=digital_amplitude,
+                    pulse_duration=pulse_duration, **kwargs)
+            finally:
+                started.set()
+
+        def stop_writing() -> None:
+            # the coroutine may have been cancelled while the ON batch was
+            # still being sent, so only send the OFF batch after it
+            started.wait()
+            self._stop_writing(**kwargs)
+
+        start = loop.run_in_executor(None, start_writing)
+        try:
+            start_time = await start
+
+            # wait for the laser to write on the pixel (until a deadline, so
+            # the time taken to hand the result back to the event loop is
+            # not added to it)
+            deadline = start_time + writing_time
+            await asyncio.sleep(max(0.0, deadline - time.perf_counter()))
+        finally:
+            # the OFF batch keeps running in the executor if the coroutine
+            # is cancelled again while waiting for it
+            await asyncio.shield(loop.run_in_executor(None, stop_writing))
 
     def calibrate(self, home_coordinates: np.ndarray | list = None) -> None:
         """ Calibrate the experiment.
 
         Always Check that everything is set in place before running the
-        experiment. Please read the printing messages and check that all
+        experiment. Please read the logged messages and check that all
         pieces of equipment have received the right commands.
 
         home_coordinates: Numpy array representing the home coordinates
@@ -162,21 +406,84 @@ class Sb2Sb3ExperimentControl:
             self.x_motor.home(new_home_position=home_coordinates[0])
             self.y_motor.home(new_home_position=home_coordinates[1])
 
-        print('The home position of the x motor is:',
-              self.x_motor.home_position)
-        print('The home position of the y motor is:',
-              self.y_motor.home_position)
+        log.info('The home position of the x motor is: %s',
+                 self.x_motor.home_position)
+        log.info('The home position of the y motor is: %s',
+                 self.y_motor.home_position)
+
+    async def _move_motors_async(self, point: np.ndarray | list) -> None:
+        """ Moves both motors (at the same time) to a point.
+
+        Args:
+            point: The coordinates [x_coordinate, y_coordinate] (measured in
+                mm) the motors will move to.
+        """
+        log.info('Move the motors to position: x=%s y=%s', point[0], point[1])
+        await asyncio.gather(
+            self.x_motor.move_to_position_async(position=point[0]),
+            self.y_motor.move_to_position_async(position=point[1]))
 
     def run_experiment(self, pixel_length: float = 0.001,
-                       visual_feedback: bool = False, **kwargs) -> None:
+                       visual_feedback: bool = False,
+                       verify_every: int = 0,
+                       settle_time: float = 0,
+                       visual_stride: int = None, **kwargs) -> None:
         """ Runs the main experiment. Writes a pixel map starting from the
-        home position of the motors.
+        home position of the motors (see run_experiment_async). Can not be
+        called from a running event loop (e.g. in a Jupyter notebook), await
+        run_experiment_async instead.
 
         Args:
             pixel_length: The length of a pixel (the length side of the
                 pixel).
             visual_feedback: Whether a plot showing the updates of the pixel
                 map to be shown.
+            verify_every: The position of the motors is read from the
+                motors (two extra USB round trips) only every verify_every
+                pixels. If 0, the position is never read and the commanded
+                position is shown instead.
+            settle_time: Extra time (in seconds) waited after the modulation
+                of each pixel has stopped. The OFF commands are confirmed by
+                the BNC (see coms.BKCom.wait_complete), so no extra wait is
+                needed by default.
+            visual_stride: The plot is only updated every visual_stride
+                pixels (and after the last one). If None is given, it is
+                chosen so that about 50 updates are drawn in total.
+            **kwargs: Other arguments given to coms.BKCom client methods.
+        """
+        asyncio.run(self.run_experiment_async(
+            pixel_length=pixel_length, visual_feedback=visual_feedback,
+            verify_every=verify_every, settle_time=settle_time,
+            visual_stride=visual_stride, **kwargs))
+
+    async def run_experiment_async(self, pixel_length: float = 0.001,
+                                   visual_feedback: bool = False,
+                                   verify_every: int = 0,
+                                   settle_time: float = 0,
+                                   visual_stride: int = None,
+                                   **kwargs) -> None:
+        """ Runs the main experiment. Writes a pixel map starting from the
+        home position of the motors. Both motors move at the same time and
+        the blocking calls to the lab equipment are run in the default
+        executor, so the event loop is free during the moves and while the
+        laser writes on each pixel.
+
+        Args:
+            pixel_length: The length of a pixel (the length side of the
+                pixel).
+            visual_feedback: Whether a plot showing the updates of the pixel
+                map to be shown.
+            verify_every: The position of the motors is read from the
+                motors (two extra USB round trips) only every verify_every
+                pixels. If 0, the position is never read and the commanded
+                position is shown instead.
+            settle_time: Extra time (in seconds) waited after the modulation
+                of each pixel has stopped. The OFF commands are confirmed by
+                the BNC (see coms.BKCom.wait_complete), so no extra wait is
+                needed by default.
+            visual_stride: The plot is only updated every visual_stride
+                pixels (and after the last one). If None is given, it is
+                chosen so that about 50 updates are drawn in total.
             **kwargs: Other arguments given to coms.BKCom client methods.
         """
         # get the correct pattern for the motors to follow
@@ -185,77 +492,199 @@ class Sb2Sb3ExperimentControl:
             start_pixel=np.array([self.x_motor.home_position-10*pixel_length,
                                   self.y_motor.home_position-10*pixel_length]))
 
-        # past points that represent pixels were written
-        past_points = []
+        # the pixels written so far are always the first n_point rows of the
+        # pattern, so a view of the pattern is used instead of a copy
+        n_pattern_points = pattern.shape[0]
 
-        # the home position of the motors (should be the current position)
-        print(f'Home position is: x={self.x_motor.home_position} and'
-              f' y={self.y_motor.home_position}')
+        # draw about 50 frames at most (the last pixel is always drawn)
+        if visual_stride is None:
+            visual_stride = max(1, n_pattern_points // 50)
 
-        # go through each point in the pattern and write a pixel
-        n_point = 0
-        for point in pattern:
-            n_point += 1
-            print(f'Move the motors to position: x={point[0]}'
-                  f' y={point[1]}')
+        # the home position of the motors (should be the current position)
+        log.info('Home position is: x=%s and y=%s',
+                 self.x_motor.home_position, self.y_motor.home_position)
+
+        loop = asyncio.get_running_loop()
+
+        # the figure is drawn by a separate process (it is sent a snapshot
+        # of the written pixels after each pixel)
+        plot_queue = None
+        if visual_feedback:
+            plot_queue = mp.Queue()
+            plot_process = mp.Process(
+                target=_plot_worker,
+                args=(plot_queue,
+                      [self.x_motor.home_position-10.5*pixel_length,
+                       self.y_motor.home_position-10.5*pixel_length],
+                      21, pixel_length),
+                daemon=True)
+            plot_process.start()
+
+        try:
+            await self._write_pattern_async(
+                pattern=pattern, verify_every=verify_every,
+                settle_time=settle_time, visual_stride=visual_stride,
+                plot_queue=plot_queue, **kwargs)
+
+            # stop sending snapshots to the plotting process (it draws the
+            # last one and keeps the figure open until it is closed)
+            if visual_feedback:
+                plot_queue.put_nowait(None)
 
-            # move the motors to each point in the pattern
-            self.x_motor.move_to_position(position=point[0])
-            self.y_motor.move_to_position(position=point[1])
+            # return to home after writing the pixel map
+            await asyncio.gather(self.x_motor.home_async(),
+                                 self.y_motor.home_async())
 
-            # the real position of the motors (as read directly from the motor)
-            motors_position = [self.x_motor.get_current_position(),
-                               self.y_motor.get_current_position()]
-            print(f'The motors are now at position: x={motors_position[0]}'
-                  f' y={motors_position[1]}')
-
-            # append the motors position
-            past_points.append(point)
-
-            # write on the current pixel
-            print('Start writing on the current pixel')
-            self._write_on_pixel(writing_time=2,
-                                 analog_amplitude=5,
-                                 digital_amplitude=5,
-                                 pulse_duration=400E-6,
-                                 **kwargs)
-            time.sleep(2)
-            print('The pixel has been written and the modulation has '
-                  'been stopped.')
+            log.info('The motors are at final position: x=%s y=%s',
+                     self.x_motor.get_current_position(),
+                     self.y_motor.get_current_position())
 
+            # wait (without blocking the event loop) until the figure showing
+            # the final pixel map is closed
             if visual_feedback:
-                # set up the figure
-                plot_pixel_pattern(
-                    pattern=past_points,
-                    start_pixel=[self.x_motor.home_position-10.5*pixel_length,
-                                 self.y_motor.home_position-10.5*pixel_length],
-                    n_pixels=21,
-                    pixel_length=pixel_length,
-                    title='Pixel number = ' + str(n_point) + '. Pixel value = '
-                          + str(past_points[-1]))
+                log.info('Close the figure to finish the experiment.')
+                await loop.run_in_executor(None, plot_process.join)
+        finally:
+            # the plotting process is left running only if the experiment
+            # failed (or was interrupted) before the figure was closed
+            if visual_feedback and plot_process.is_alive():
+                plot_process.terminate()
+
+    async def _write_pattern_async(self, pattern: np.ndarray,
+                                   verify_every: int, settle_time: float,
+                                   visual_stride: int,
+                                   plot_queue: 'mp.Queue | None',
+                                   **kwargs) -> None:
+        """ Moves the motors to each point of a pattern and writes a pixel
+        there (see run_experiment_async). If writing the pattern fails (or
+        is interrupted) the motors and the laser modulation are stopped
+        before the error is raised.
 
-        # return to home after writing the pixel map
-        self.x_motor.home()
-        self.y_motor.home()
+        Args:
+            pattern: Numpy array representing the position of each pixel.
+            verify_every: The position read back from the motors every
+                verify_every pixels (see run_experiment_async).
+            settle_time: Extra time (in seconds) waited after each pixel.
+            visual_stride: A snapshot of the pixels written is sent to the
+                plotting process every visual_stride pixels (and after the
+                last one).
+            plot_queue: Queue of the plotting process (see _plot_worker), or
+                None if there is no visual feedback.
+            **kwargs: Other arguments given to coms.BKCom client methods.
+        """
+        loop = asyncio.get_running_loop()
+        n_pattern_points = pattern.shape[0]
+
+        # go through each point in the pattern and write a pixel. The move
+        # to the first point is started here and the move to each next point
+        # is started as soon as the laser modulation of the current pixel
+        # has stopped (overlapping the wait after each pixel is written).
+        pending_move = asyncio.create_task(self._move_motors_async(pattern[0]))
+        try:
+            # the laser modulation used for every pixel
+            modulation = dict(analog_amplitude=5, digital_amplitude=5,
+                              pulse_duration=400E-6)
+
+            # arm the BNC with the modulation waveforms only once, while the
+            # motors move to the first point (each pixel then only toggles the
+            # outputs and restarts the burst)
+            await loop.run_in_executor(
+                None, functools.partial(self._arm_pixel_writer,
+                                        **modulation, **kwargs))
+
+            # the objects used on every pixel, looked up only once
+            move_motors = self._move_motors_async
+            write_pixel = self._write_pattern_pixel_async
+
+            for n_point in range(1, n_pattern_points + 1):
+                point = pattern[n_point-1]
+
+                # the real position of the motors (as read directly from the
+                # motor) is only read every verify_every pixels
+                await write_pixel(
+                    pending_move=pending_move, point=point,
+                    verify=bool(verify_every)
+                    and n_point % verify_every == 0,
+                    modulation=modulation, **kwargs)
+
+                # the laser is off, so the motors can move to the next point
+                if n_point < n_pattern_points:
+                    pending_move = asyncio.create_task(
+                        move_motors(pattern[n_point]))
+                if settle_time > 0:
+                    await asyncio.sleep(settle_time)
+                log.info('The pixel has been written and the modulation has '
+                         'been stopped.')
+
+                if plot_queue is not None and (n_point % visual_stride == 0
+                                               or n_point == n_pattern_points):
+                    # send the new pixel to the plotting process
+                    plot_queue.put_nowait(
+                        (pattern[:n_point],
+                         'Pixel number = ' + str(n_point) + '. Pixel value = '
+                         + str(point)))
+        except BaseException:
+            # the moves keep running in the threads of the motors if the
+            # pending move is only cancelled, so the motors are stopped too.
+            # The OFF batch is sent after the one (possibly) still being
+            # sent by _write_on_pixel_async, as the BNC client is locked
+            # while a batch is written.
+            pending_move.cancel()
+            await asyncio.shield(asyncio.gather(
+                loop.run_in_executor(None, self.x_motor.stop),
+                loop.run_in_executor(None, self.y_motor.stop)))
+            await asyncio.gather(pending_move, return_exceptions=True)
+            await asyncio.shield(loop.run_in_executor(
+                None, functools.partial(self._stop_writing, **kwargs)))
+            raise
+
+    async def _write_pattern_pixel_async(self, pending_move: asyncio.Task,
+                                         point: np.ndarray, verify: bool,
+                                         modulation: dict,
+                                         **kwargs) -> None:
+        """ Writes one pixel of a pattern (see _write_pattern_async) once
+        the motors have reached its point.
+
+        Args:
+            pending_move: Task of the move of the motors to the point.
+            point: Numpy array representing the position of the pixel.
+            verify: Boolean representing whether the position of the motors
+                is read back from them (else the commanded position is
+                used).
+            modulation: Dictionary of the laser modulation used for the
+                pixel (see _write_on_pixel_async).
+            **kwargs: Other arguments given to coms.BKCom client methods.
+        """
+        # wait for the motors to reach the point
+        await pending_move
+
+        if verify:
+            motors_position = [self.x_motor.get_current_position(),
+                               self.y_motor.get_current_position()]
+        else:
+            motors_position = point
+        log.info('The motors are now at position: x=%s y=%s',
+                 motors_position[0], motors_position[1])
 
-        print(f'The motors are at final position: '
-              f' x={self.x_motor.get_current_position()}'
-              f' y={self.y_motor.get_current_position()}')
+        # write on the pixel
+        log.info('Start writing on the current pixel')
+        await self._write_on_pixel_async(writing_time=2, **modulation,
+                                         **kwargs)
 
 
 if __name__ == '__main__':
-    # used only for testing and debugging
-    debug_experiment_control = Sb2Sb3ExperimentControl(
-        x_kdc101_address='27005180',
-        y_kdc101_address='27005183')
-
-    # calibrate the experiment
-    print('>>>>>>> Starting calibration!')
-    debug_experiment_control.calibrate()
-    print('>>>>>>> Ending calibration!')
-
-    # run the experiment
-    debug_experiment_control.run_experiment(n_pixels=5,
-                                            pixel_length=0.004,
-                                            visual_feedback=True,
-                                            query_mode=False)
+    # used only for testing and debugging (show the progress messages)
+    logging.basicConfig(format='%(message)s')
+    with Sb2Sb3ExperimentControl(
+            x_kdc101_address='27005180',
+            y_kdc101_address='27005183',
+            verbose=True) as debug_experiment_control:
+
+        # calibrate the experiment
+        print('>>>>>>> Starting calibration!')
+        debug_experiment_control.calibrate()
+        print('>>>>>>> Ending calibration!')
+
+        # run the experiment
+        asyncio.run(debug_experiment_control.run_experiment_async(
+            pixel_length=0.004, visual_feedback=True, query_mode=False))
@@ -3,17 +3,22 @@ Created by Daniel-Iosif Trubacs for the UoS QLM group on 9 August 2023. The
 purpose of this module is to create certain utilities functions to help
 with the running of the experiments.
 
-Last update: 28 October 2023
+Last update: 14 October 2026
 """
 
+import functools
 from matplotlib import pyplot as plt
+from matplotlib.collections import LineCollection
 import numpy as np
 
 
 def plot_pixel_pattern(pattern: np.ndarray | list, title: str,
                        start_pixel: np.ndarray | list, n_pixels: int,
-                       pixel_length: float) -> None:
-    """ Plots a pixel pattern.
+                       pixel_length: float,
+                       max_labels: int = 1000,
+                       axes: plt.Axes = None) -> plt.Axes:
+    """ Plots a pixel pattern. The figure is not shown (call plt.show) and
+    is not closed, so its lifetime is managed by the caller.
 
     Args:
         pattern: Numpy array representing the position of each pixel
@@ -21,39 +26,173 @@ def plot_pixel_pattern(pattern: np.ndarray | list, title: str,
         start_pixel: The pixel from where the plot will start (bottom left).
         n_pixels: The number of pixels shown in the plot.
         pixel_length: The size of each pixel.
+        max_labels: The pixels are only numbered (one text label for each
+            pixel) if the pattern has at most max_labels pixels.
+        axes: The matplotlib axes on which the pattern is plotted. If None
+            is given, a new figure is created.
+
+    Returns:
+        The matplotlib axes on which the pattern has been plotted.
     """
-    # create the figure
-    plt.figure(figsize=(12, 8))
-    plt.title(title)
-    plt.xlabel('X position (mm)')
-    plt.ylabel("Y position (mm)")
+    # create the figure only if no axes are given
+    if axes is None:
+        _, axes = plt.subplots(figsize=(12, 8))
+    axes.set_title(title)
+    axes.set_xlabel('X position (mm)')
+    axes.set_ylabel("Y position (mm)")
 
     # set the limits
-    plt.xlim([start_pixel[0], pixel_length * n_pixels + start_pixel[0]])
-    plt.ylim([start_pixel[1], pixel_length * n_pixels + start_pixel[1]])
-
-    # show the pixel grid
-    for n_grid in range(n_pixels):
-        plt.vlines(x=pixel_length * n_grid + start_pixel[0],
-                   ymin=start_pixel[1],
-                   ymax=pixel_length * n_pixels + start_pixel[1],
-                   color='black')
-
-        plt.hlines(y=pixel_length * n_grid + start_pixel[1],
-                   xmin=start_pixel[0],
-                   xmax=pixel_length * n_pixels + start_pixel[0],
-                   color='black')
-
-        # show the pixel centers and their order
-        pixel_number = 0
-        for point in pattern:
-            plt.plot(point[0], point[1], marker='o', markersize=15,
-                     color='blue')
-            plt.text(point[0], point[1], str(pixel_number), size=15)
-            pixel_number += 1
-
-    # show the pattern
-    plt.show()
+    x_min, y_min = start_pixel[0], start_pixel[1]
+    x_max = pixel_length * n_pixels + x_min
+    y_max = pixel_length * n_pixels + y_min
+    axes.set_xlim([x_min, x_max])
+    axes.set_ylim([y_min, y_max])
+
+    # show the pixel grid (all the lines drawn as one collection)
+    grid = np.arange(n_pixels + 1) * pixel_length
+    lines = ([[(x_min + x, y_min), (x_min + x, y_max)] for x in grid] +
+             [[(x_min, y_min + y), (x_max, y_min + y)] for y in grid])
+    axes.add_collection(LineCollection(lines, colors='black',
+                                       rasterized=True))
+
+    # show the pixel centers (all drawn as one collection)
+    pattern = np.asarray(pattern)
+    if len(pattern):
+        axes.scatter(pattern[:, 0], pattern[:, 1], s=15 ** 2, color='blue',
+                     rasterized=True)
+
+    # show the order of the pixels (unreadable for very large patterns)
+    if len(pattern) <= max_labels:
+        for pixel_number, point in enumerate(pattern):
+            axes.text(point[0], point[1], str(pixel_number), size=15)
+
+    return axes
+
+
+class LivePixelPattern:
+    """ Figure showing the pixels written so far, updated in place while an
+    experiment is running (see plot_pixel_pattern for a static plot).
+
+    The figure, the pixel grid and the markers are created only once, so
+    each update only moves the markers and adds the number of the new
+    pixels instead of drawing the whole figure again. If the matplotlib
+    backend supports blitting, only the changed artists are rendered.
+
+    Attributes:
+        figure: The matplotlib figure.
+        axes: The matplotlib axes of the figure.
+        scatter: The scatter plot showing the pixel centres.
+        n_points: The number of pixels shown so far.
+    """
+    def __init__(self, start_pixel: np.ndarray | list, n_pixels: int,
+                 pixel_length: float, title: str = '') -> None:
+        """
+        Args:
+            start_pixel: The pixel from where the plot will start (bottom
+                left).
+            n_pixels: The number of pixels shown in the plot.
+            pixel_length: The size of each pixel.
+            title: The title of the figure.
+        """
+        # interactive mode, so that showing the figure does not block
+        plt.ion()
+
+        # create the figure
+        self.figure, self.axes = plt.subplots(figsize=(12, 8))
+        self.axes.set_title(title)
+        self.axes.set_xlabel('X position (mm)')
+        self.axes.set_ylabel('Y position (mm)')
+
+        # set the limits
+        x_min, y_min = start_pixel[0], start_pixel[1]
+        x_max = pixel_length * n_pixels + x_min
+        y_max = pixel_length * n_pixels + y_min
+        self.axes.set_xlim([x_min, x_max])
+        self.axes.set_ylim([y_min, y_max])
+
+        # show the pixel grid (all the lines drawn as one collection)
+        grid = np.arange(n_pixels + 1) * pixel_length
+        lines = ([[(x_min + x, y_min), (x_min + x, y_max)] for x in grid] +
+                 [[(x_min, y_min + y), (x_max, y_min + y)] for y in grid])
+        self.axes.add_collection(LineCollection(lines, colors='black'))
+
+        # the pixel centres, updated in place
+        self.scatter = self.axes.scatter([], [], s=15 ** 2, color='blue')
+        self.n_points = 0
+
+        # if the backend supports it, only the markers and the title are
+        # redrawn on each update (blitting) on top of a saved background
+        # holding everything else (the grid, the axes and the number labels)
+        self._use_blit = self.figure.canvas.supports_blit
+        self._background = None
+        if self._use_blit:
+            self.scatter.set_animated(True)
+            self.axes.title.set_animated(True)
+            # the background is saved again every time the whole figure is
+            # drawn (e.g. after the window is resized)
+            self.figure.canvas.mpl_connect('draw_event', self._on_draw)
+
+        plt.show()
+        self.figure.canvas.draw()
+
+    def _on_draw(self, event) -> None:
+        """ Saves the background of the figure once it has been drawn and
+        draws the animated artists on top of it.
+
+        Args:
+            event: The matplotlib draw event.
+        """
+        self._background = self.figure.canvas.copy_from_bbox(
+            self.figure.bbox)
+        self._draw_animated()
+
+    def _draw_animated(self) -> None:
+        """ Draws the artists that change on every update. """
+        self.figure.draw_artist(self.scatter)
+        self.figure.draw_artist(self.axes.title)
+
+    def update(self, points: np.ndarray | list, title: str = None) -> None:
+        """ Shows the given pixels (only the pixels not shown yet get a new
+        number label).
+
+        Args:
+            points: Numpy array representing the position of each pixel
+                written so far.
+            title: The new title of the figure. If None is given, the title
+                is not changed.
+        """
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        self.scatter.set_offsets(points)
+
+        # show the order of the new pixels
+        new_labels = [self.axes.text(points[pixel_number][0],
+                                     points[pixel_number][1],
+                                     str(pixel_number), size=15)
+                      for pixel_number in range(self.n_points, len(points))]
+        self.n_points = len(points)
+
+        if title is not None:
+            self.axes.set_title(title)
+
+        canvas = self.figure.canvas
+        if not self._use_blit or self._background is None:
+            # redraw and yield to the GUI event loop without blocking
+            plt.pause(0.001)
+            return
+
+        # add the new labels to the background, then draw the markers and
+        # the title on top of it
+        canvas.restore_region(self._background)
+        if new_labels:
+            for label in new_labels:
+                self.figure.draw_artist(label)
+            self._background = canvas.copy_from_bbox(self.figure.bbox)
+        self._draw_animated()
+        canvas.blit(self.figure.bbox)
+
+        # yield to the GUI event loop (so the window stays responsive)
+        # without blocking the experiment or redrawing the whole figure
+        canvas.start_event_loop(0.001)
 
 
 def get_horizontal_pattern(start_pixel: np.ndarray | list, n_pixels: int = 3,
@@ -75,13 +214,13 @@ def get_horizontal_pattern(start_pixel: np.ndarray | list, n_pixels: int = 3,
         2D numpy array (n_pixels**2, 2) representing the coordinates of the
         centre of each pixel in the horizontal line pattern.
     """
-    # the horizontal pattern
-    pattern = np.zeros((n_pixels, 2))
+    # the horizontal pattern (every element is set below)
+    pattern = np.empty((n_pixels, 2))
 
-    # go through each point in the pattern and change it according to direction
-    for i in range(n_pixels):
-        pattern[i][0] += direction * pixel_length * i + start_pixel[0]
-        pattern[i][1] = start_pixel[1]
+    # set all the points in the pattern at once according to direction
+    pattern[:, 0] = (direction * pixel_length * np.arange(n_pixels) +
+                     start_pixel[0])
+    pattern[:, 1] = start_pixel[1]
 
     # return the pattern
     return pattern
@@ -106,26 +245,31 @@ def get_vertical_pattern(start_pixel: np.ndarray | list, n_pixels: int = 3,
         2D numpy array (n_pixels**2, 2) representing the coordinates of the
         centre of each pixel in the vertical line pattern.
     """
-    # the horizontal pattern
-    pattern = np.zeros((n_pixels, 2))
+    # the vertical pattern (every element is set below)
+    pattern = np.empty((n_pixels, 2))
 
-    # go through each point in the pattern and change it according to direction
-    for i in range(n_pixels):
-        pattern[i][0] = start_pixel[0]
-        pattern[i][1] += direction * pixel_length * i + start_pixel[1]
+    # set all the points in the pattern at once according to direction
+    pattern[:, 0] = start_pixel[0]
+    pattern[:, 1] = (direction * pixel_length * np.arange(n_pixels) +
+                     start_pixel[1])
 
     # return the pattern
     return pattern
 
 
 def get_square_pattern(start_pixel: np.ndarray | list, n_pixels: int = 3,
-                       pixel_length: float = 1.0) -> np.ndarray:
+                       pixel_length: float = 1.0,
+                       dtype: np.dtype = np.float64) -> np.ndarray:
     """ Gets the pattern followed by the motors to build a squared made of
     multiple pixels.
 
     The pattern represents the coordinates of the centre of each pixel
     given in a lawnmower pattern starting from  [0,0].
 
+    The patterns are cached (they are often built multiple times with the
+    same arguments, e.g. during parameter sweeps), so the returned array is
+    read-only. Copy it before changing it.
+
     Args:
         start_pixel: Coordinates of the pixel [x_coordinate, y_coordinates]
             representing the place from where to start the pixel map
@@ -134,50 +278,43 @@ def get_square_pattern(start_pixel: np.ndarray | list, n_pixels: int = 3,
             mind the actual total number of pixels will be n_pixels**2.
         pixel_length: The length of a pixel (the length side of the
             pixel).
+        dtype: The data type of the returned coordinates (default float64).
+            float32 halves the memory used by large patterns, but keep in
+            mind that it only has about 7 significant digits (e.g. 0.5 nm
+            at a position of 5 mm).
 
     Returns:
         2D numpy array (n_pixels**2, 2) representing the coordinates of the
         centre of each pixel in the square listed in a lawnmower pattern.
     """
-    # create a numpy array representing the square of the pixels (pixel_map)
-    # the last channel represents the x-y coordinates and the
-    # pixel number (from 0 to n_pixels**2-1)
-    pixel_map = np.zeros((n_pixels, n_pixels, 3))
-
-    # set the value of each pixel in the array to the physical centre of the
-    pixel_number = 0
-    for i in range(n_pixels):
-        # number the pixels from start_pixel in lawnmower pattern
-        if i % 2 == 0:
-            for j in range(n_pixels):
-                pixel_map[i][j] = [
-                    (2 * i + 1) * pixel_length / 2 + start_pixel[0],
-                    (2 * j + 1) * pixel_length / 2 + start_pixel[1],
-                    pixel_number]
-                pixel_number += 1
-        else:
-            for j in range(n_pixels):
-                pixel_map[i][j] = [
-                    (2 * i + 1) * pixel_length / 2 + start_pixel[0],
-                    (2 * (n_pixels - j) - 1) * pixel_length / 2 +
-                    start_pixel[1],
-                    pixel_number]
-                pixel_number += 1
-
-    # add the star-pixel values to the pixel map
-    print(pixel_map.shape, pixel_map[0][0])
+    return _get_square_pattern(start_x=float(start_pixel[0]),
+                               start_y=float(start_pixel[1]),
+                               n_pixels=int(n_pixels),
+                               pixel_length=float(pixel_length),
+                               dtype=np.dtype(dtype))
+
+
+@functools.lru_cache(maxsize=32)
+def _get_square_pattern(start_x: float, start_y: float, n_pixels: int,
+                        pixel_length: float, dtype: np.dtype) -> np.ndarray:
+    """ Cached implementation of get_square_pattern (the arguments must be
+    hashable, so the start pixel is given as two floats).
+    """
+    # the centres of the pixels along each side of the square
+    centres = (2*np.arange(n_pixels) + 1)*pixel_length/2
+    x_grid, y_grid = np.meshgrid(centres + start_x, centres + start_y,
+                                 indexing='ij')
 
-    # the coordinates assembled in the lawnmower pattern
-    pattern = np.zeros((n_pixels ** 2, 2))
-    for i in range(n_pixels):
-        for j in range(n_pixels):
-            pixel_number = int(pixel_map[i][j][2])
+    # number the pixels in lawnmower pattern (every other column of pixels
+    # is followed downwards)
+    y_grid[1::2] = y_grid[1::2, ::-1]
 
-            # the x coordinates in the pattern for each pixel
-            pattern[pixel_number][0] = pixel_map[i][j][0]
+    # the coordinates assembled in the lawnmower pattern
+    pattern = np.stack((x_grid, y_grid), axis=-1).reshape(-1, 2)
 
-            # the y coordinates in the pattern for each pixel
-            pattern[pixel_number][1] = pixel_map[i][j][1]
+    # the cached pattern is shared between the callers
+    pattern = np.ascontiguousarray(pattern, dtype=dtype)
+    pattern.setflags(write=False)
 
     # return the pattern
     return pattern
@@ -197,42 +334,40 @@ def get_s_pattern(start_pixel: np.ndarray | list, n_pixels: int = 3,
         2D numpy array (n_pixels**2, 2) representing the coordinates of the
         centre of each pixel in the S letter pattern.
     """
+    # the lines of the letter (each one starts where the previous one ends)
+    # are joined only once at the end
     # get the bottom line of S
-    s_pattern = get_horizontal_pattern(start_pixel=start_pixel,
+    segments = [get_horizontal_pattern(start_pixel=start_pixel,
                                        n_pixels=n_pixels,
                                        pixel_length=pixel_length,
-                                       direction=1)
+                                       direction=1)]
 
     # get the right vertical line of S
-    pattern = get_vertical_pattern(start_pixel=s_pattern[-1],
-                                   n_pixels=n_pixels,
-                                   pixel_length=pixel_length,
-                                   direction=1)
-    s_pattern = np.concatenate((s_pattern, pattern))
+    segments.append(get_vertical_pattern(start_pixel=segments[-1][-1],
+                                         n_pixels=n_pixels,
+                                         pixel_length=pixel_length,
+                                         direction=1))
 
     # get the middle horizontal line
-    pattern = get_horizontal_pattern(start_pixel=s_pattern[-1],
-                                     n_pixels=n_pixels,
-                                     pixel_length=pixel_length,
-                                     direction=-1)
-    s_pattern = np.concatenate((s_pattern, pattern))
+    segments.append(get_horizontal_pattern(start_pixel=segments[-1][-1],
+                                           n_pixels=n_pixels,
+                                           pixel_length=pixel_length,
+                                           direction=-1))
 
     # get the left vertical line of S
-    pattern = get_vertical_pattern(start_pixel=s_pattern[-1],
-                                   n_pixels=n_pixels,
-                                   pixel_length=pixel_length,
-                                   direction=1)
-    s_pattern = np.concatenate((s_pattern, pattern))
+    segments.append(get_vertical_pattern(start_pixel=segments[-1][-1],
+                                         n_pixels=n_pixels,
+                                         pixel_length=pixel_length,
+                                         direction=1))
 
     # get the up horizontal line
-    pattern = get_horizontal_pattern(start_pixel=s_pattern[-1],
-                                     n_pixels=n_pixels,
-                                     pixel_length=pixel_length,
-                                     direction=1)
-    s_pattern = np.concatenate((s_pattern, pattern))
+    segments.append(get_horizontal_pattern(start_pixel=segments[-1][-1],
+                                           n_pixels=n_pixels,
+                                           pixel_length=pixel_length,
+                                           direction=1))
 
     # return the s_pattern found
-    return s_pattern
+    return np.concatenate(segments)
 
 
 def get_o_pattern(start_pixel: np.ndarray | list, n_pixels_width: int = 3,
@@ -252,35 +387,34 @@ def get_o_pattern(start_pixel: np.ndarray | list, n_pixels_width: int = 3,
         2D numpy array (n_pixels**2, 2) representing the coordinates of the
         centre of each pixel in the O letter pattern.
     """
+    # the lines of the letter (each one starts where the previous one ends)
+    # are joined only once at the end
     # get the bottom line of S
-    o_pattern = get_horizontal_pattern(start_pixel=start_pixel,
+    segments = [get_horizontal_pattern(start_pixel=start_pixel,
                                        n_pixels=n_pixels_width,
                                        pixel_length=pixel_length,
-                                       direction=1)
+                                       direction=1)]
 
     # get the right vertical line of O
-    pattern = get_vertical_pattern(start_pixel=o_pattern[-1],
-                                   n_pixels=n_pixels_height,
-                                   pixel_length=pixel_length,
-                                   direction=1)
-    o_pattern = np.concatenate((o_pattern, pattern))
+    segments.append(get_vertical_pattern(start_pixel=segments[-1][-1],
+                                         n_pixels=n_pixels_height,
+                                         pixel_length=pixel_length,
+                                         direction=1))
 
     # get the up horizontal line
-    pattern = get_horizontal_pattern(start_pixel=o_pattern[-1],
-                                     n_pixels=n_pixels_width,
-                                     pixel_length=pixel_length,
-                                     direction=-1)
-    o_pattern = np.concatenate((o_pattern, pattern))
+    segments.append(get_horizontal_pattern(start_pixel=segments[-1][-1],
+                                           n_pixels=n_pixels_width,
+                                           pixel_length=pixel_length,
+                                           direction=-1))
 
     # get the left vertical line of O
-    pattern = get_vertical_pattern(start_pixel=o_pattern[-1],
-                                   n_pixels=n_pixels_height,
-                                   pixel_length=pixel_length,
-                                   direction=-1)
-    o_pattern = np.concatenate((o_pattern, pattern))
+    segments.append(get_vertical_pattern(start_pixel=segments[-1][-1],
+                                         n_pixels=n_pixels_height,
+                                         pixel_length=pixel_length,
+                                         direction=-1))
 
     # return the s_pattern found
-    return o_pattern
+    return np.concatenate(segments)
 
 
 def get_t_pattern(start_pixel: np.ndarray | list, n_pixels_width: int = 3,
@@ -319,11 +453,9 @@ def get_t_pattern(start_pixel: np.ndarray | list, n_pixels_width: int = 3,
         n_pixels=int(n_pixels_width / 2) + 1,
         pixel_length=pixel_length,
         direction=1)
-    t_pattern = np.concatenate((t_pattern, left_pattern))
-    t_pattern = np.concatenate((t_pattern, right_pattern))
 
     # return the t_pattern found
-    return t_pattern
+    return np.concatenate((t_pattern, left_pattern, right_pattern))
 
 
 def get_n_pattern(start_pixel: np.ndarray | list, n_pixels_width: int = 3,
@@ -350,12 +482,12 @@ def get_n_pattern(start_pixel: np.ndarray | list, n_pixels_width: int = 3,
                                      pixel_length=pixel_length,
                                      direction=1)
 
-    # get the diagonal points between the two vertical lines of N
-    for n in range(int(n_pixels_width/2)):
-        diagonal_point = n_pattern[-1] + [pixel_length, -pixel_length]
-        diagonal_point = np.reshape(a=diagonal_point,
-                                    newshape=(1, 2))
-        n_pattern = np.concatenate((n_pattern, diagonal_point))
+    # get the diagonal points between the two vertical lines of N (each one
+    # is one pixel to the right and one pixel down from the previous one)
+    steps = np.tile([pixel_length, -pixel_length],
+                    (int(n_pixels_width/2), 1))
+    diagonal_pattern = np.cumsum(
+        np.concatenate((n_pattern[-1:], steps)), axis=0)[1:]
 
     # get the right vertical line of T
     pattern = get_vertical_pattern(
@@ -363,10 +495,9 @@ def get_n_pattern(start_pixel: np.ndarray | list, n_pixels_width: int = 3,
         n_pixels=n_pixels_height,
         pixel_length=pixel_length,
         direction=1)
-    n_pattern = np.concatenate((n_pattern, pattern))
 
     # return the t_pattern found
-    return n_pattern
+    return np.concatenate((n_pattern, diagonal_pattern, pattern))
 
 
 def get_soton_pattern(start_pixel: np.ndarray | list,
@@ -374,6 +505,10 @@ def get_soton_pattern(start_pixel: np.ndarray | list,
     """ Get the SOTON pattern being written in pixels. The size of all
     letters is 3x5 (except N which is 4x5)
 
+    The patterns are cached (the same pattern is written on every run of
+    the experiment), so the returned array is read-only. Copy it before
+    changing it.
+
     Args:
         start_pixel: Coordinates of the pixel [x_coordinate, y_coordinates]
             representing the place from where to start the pattern.
@@ -383,38 +518,58 @@ def get_soton_pattern(start_pixel: np.ndarray | list,
     Returns: 2D numpy array (n_pixels**2, 2) representing the coordinates of
         the centre of each pixel in the SOTON pattern.
     """
+    return _get_soton_pattern(start_x=float(start_pixel[0]),
+                              start_y=float(start_pixel[1]),
+                              pixel_length=float(pixel_length))
+
+
+@functools.lru_cache(maxsize=32)
+def _get_soton_pattern(start_x: float, start_y: float,
+                       pixel_length: float) -> np.ndarray:
+    """ Cached implementation of get_soton_pattern (the arguments must be
+    hashable, so the start pixel is given as two floats).
+    """
+    start_pixel = np.array([start_x, start_y])
+
+    # the patterns of the letters are joined only once at the end
     # get the pattern of letter S
-    soton_pattern = get_s_pattern(start_pixel=start_pixel,
-                                  pixel_length=pixel_length,
-                                  n_pixels=3)
+    letters = [get_s_pattern(start_pixel=start_pixel,
+                             pixel_length=pixel_length,
+                             n_pixels=3)]
 
     # get the pattern of letter O
     o_pattern = get_o_pattern(start_pixel=start_pixel + [pixel_length*3, 0],
                               pixel_length=pixel_length,
                               n_pixels_height=5,
                               n_pixels_width=3)
-    soton_pattern = np.concatenate((soton_pattern, o_pattern))
+    letters.append(o_pattern)
 
     # get the pattern of letter T
     t_pattern = get_t_pattern(start_pixel=start_pixel + [pixel_length * 7, 0],
                               pixel_length=pixel_length,
                               n_pixels_height=5,
                               n_pixels_width=3)
-    soton_pattern = np.concatenate((soton_pattern, t_pattern))
+    letters.append(t_pattern)
 
     # get the pattern of letter O
     o_pattern = get_o_pattern(start_pixel=start_pixel + [pixel_length * 9, 0],
                               pixel_length=pixel_length,
                               n_pixels_height=5,
                               n_pixels_width=3)
-    soton_pattern = np.concatenate((soton_pattern, o_pattern))
+    letters.append(o_pattern)
 
     # get the pattern of letter N
     n_pattern = get_n_pattern(start_pixel=start_pixel + [pixel_length * 12, 0],
                               pixel_length=pixel_length,
                               n_pixels_height=5,
                               n_pixels_width=4)
-    soton_pattern = np.concatenate((soton_pattern, n_pattern))
+    letters.append(n_pattern)
+
+    # the cached pattern is shared between the callers (one contiguous
+    # float64 array, so that slices of it are cheap views)
+    soton_pattern = np.ascontiguousarray(np.concatenate(letters),
+                                         dtype=np.float64)
+    soton_pattern.setflags(write=False)
 
     # return the SOTON pattern found
     return soton_pattern
@@ -441,3 +596,4 @@ if __name__ == '__main__':
                        pixel_length=debug_pixel_length,
                        n_pixels=debug_n_pixels_plot,
                        title='Pixels arranged in a lawnmower pattern')
+    plt.show()
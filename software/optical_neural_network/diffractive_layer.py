@@ -8,6 +8,9 @@ For more information about the mathematical algorithms behind the optical
 neural network used please check the following References:
 
 1. https://www.science.org/doi/10.1126/science.aat8084#supplementary-materials
+
+
+Last update: 14 October 2026.
 """
 import numpy as np
 import torch
@@ -40,7 +43,8 @@ class DiffractiveLayer(torch.nn.Module):
             have this z coordinates as their position.
         neuron_coordinates: Tensor of shape (size, size, 3) representing the
             position of all neurons (x, y, z). See utils.find_coordinate_matrix
-            for more information.
+            for more information. It is registered as a (float32) buffer, so
+            it is moved together with the layer (e.g. by layer.to(device)).
     """
     def __init__(self, size: int, length: float, z_coordinate: float) -> None:
         super().__init__()
@@ -54,11 +58,12 @@ class DiffractiveLayer(torch.nn.Module):
         self.weights = torch.nn.Parameter(torch.rand(size=(size, size),
                                                      dtype=torch.cfloat))
 
-        # the position of each neuron
-        self.neuron_coordinates = torch.from_numpy(find_coordinate_matrix(
-            n_size=self.size, n_length=self.length,
-            z_coordinate=self.z_coordinate
-        ))
+        # the position of each neuron (float32, the same precision as the
+        # complex64 weights)
+        self.register_buffer('neuron_coordinates', torch.from_numpy(
+            find_coordinate_matrix(n_size=self.size, n_length=self.length,
+                                   z_coordinate=self.z_coordinate)
+        ).to(torch.float32))
 
     def _get_amplitude_map(self) -> np.ndarray:
         """ Gets the amplitude map of the neurons weights.
@@ -67,10 +72,9 @@ class DiffractiveLayer(torch.nn.Module):
             Numpy arrays of shape (size, size) containing the
             absolute value of each weight.
         """
-        # copy the weights to a numpy array
-        numpy_weights = self.weights.detach().cpu().numpy()
-
-        return np.absolute(numpy_weights)
+        # compute the amplitudes on the device of the weights and copy only
+        # the (real) result to a numpy array
+        return self.weights.detach().abs().cpu().numpy()
 
     def _get_phase_map(self) -> np.ndarray:
         """ Gets the phase map of the neurons weights.
@@ -79,10 +83,9 @@ class DiffractiveLayer(torch.nn.Module):
             Numpy arrays of shape (size, size) containing the phase
             value of each weight.
         """
-        # copy the weights to a numpy array
-        numpy_weights = self.weights.detach().cpu().numpy()
-
-        return np.angle(numpy_weights)
+        # compute the phases on the device of the weights and copy only the
+        # (real) result to a numpy array
+        return self.weights.detach().angle().cpu().numpy()
 
     def plot_amplitude_map(self) -> None:
         """Plots the amplitude map."""
@@ -115,10 +118,9 @@ class DiffractiveLayer(torch.nn.Module):
         plt.show()
 
     def forward(self, x):
-        # simply a forward pass representing the Hadamard product
-        output = torch.mul(x, self.weights)
-        print(output.abs())
-        return output.abs()
+        # simply a forward pass representing the Hadamard product (the
+        # magnitude is computed only once)
+        return torch.mul(x, self.weights).abs()
 
 
 if __name__ == '__main__':
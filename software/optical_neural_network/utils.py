@@ -20,18 +20,17 @@ def find_coordinate_matrix(n_size: int, n_length: float,
         Numpy array containing the coordinates of elements (n_size, n_size, 3)
         where the last entry represents: (x, y, z).
     """
-    # the matrix containing all coordinates
-    matrix = np.zeros(shape=(n_size, n_size, 3))
-
     # length of one pixel (or physical element of the matrix)
     pixel_length = n_length/n_size
 
-    # go through each element in the matrix and assign its value
-    for i in range(n_size):
-        for j in range(n_size):
-            matrix[i][j] = np.array([pixel_length*(i+0.5),
-                                     pixel_length*(j+0.5),
-                                     z_coordinate])
+    # coordinates of the pixel centres along one side of the matrix
+    centres = pixel_length*(np.arange(n_size)+0.5)
+
+    # the matrix containing all coordinates, built in one pass
+    matrix = np.empty(shape=(n_size, n_size, 3))
+    matrix[:, :, 0] = centres[:, np.newaxis]
+    matrix[:, :, 1] = centres[np.newaxis, :]
+    matrix[:, :, 2] = z_coordinate
 
     return matrix
 
@@ -0,0 +1,16 @@
+"""
+Created for the UoS QLM group on 14 October 2026. The purpose of this module
+is to make the packages of the repository (and the experiments modules,
+which import each other by module name) importable by the tests.
+
+
+Last update: 14 October 2026.
+"""
+import os
+import sys
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+for path in (_ROOT, os.path.join(_ROOT, 'experiments')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
@@ -0,0 +1,211 @@
+"""
+Created for the UoS QLM group on 14 October 2026. The purpose of this module
+is to test the commands written by the coms.bk_precision_4063_b.BKCom client
+class, using a mocked pyvisa resource (no instrument is needed).
+
+
+Last update: 14 October 2026.
+"""
+import time
+from unittest import mock
+
+from coms.bk_precision_4063_b import BKCom
+
+
+def make_bk_com(**kwargs) -> BKCom:
+    """ Creates a BKCom client whose resource manager and instrument are
+    mocks.
+
+    Args:
+        **kwargs: Other arguments given to BKCom.
+
+    Returns:
+        The BKCom client object (the mocked instrument is bk_com.instrument).
+    """
+    resource_manager = mock.MagicMock()
+    return BKCom('USB0::FAKE::INSTR', resource_manager=resource_manager,
+                 **kwargs)
+
+
+def written(bk_com: BKCom) -> list:
+    """ Gets the messages written to the mocked instrument.
+
+    Args:
+        bk_com: The BKCom client object (see make_bk_com).
+
+    Returns:
+        List of the messages (bytes, with termination) written so far.
+    """
+    return [call.args[0]
+            for call in bk_com.instrument.write_raw.call_args_list]
+
+
+def test_set_digital_modulation_command():
+    bk_com = make_bk_com()
+    bk_com.set_digital_modulation()
+
+    assert written(bk_com) == [
+        b'C1:MDWV STATE,ON;'
+        b'C1:MDWV AM,MDSP,SINE,SRC,INT,FRQ,100HZ,AMP,1V,DEPTH,100,DEVI,180\n']
+
+
+def test_set_digital_modulation_parameters():
+    bk_com = make_bk_com(use_batched=False)
+    bk_com.set_digital_modulation(channel='C2', modulation_mode='OFF',
+                                  modulation_type='FM',
+                                  modulation_wave_shape='SQUARE',
+                                  modulation_source='EXT',
+                                  modulation_frequency=250,
+                                  modulation_depth=50,
+                                  modulation_deviation=90,
+                                  modulation_amplitude=2.5)
+
+    messages = written(bk_com)
+    assert messages == [
+        b'C2:MDWV STATE,OFF\n',
+        b'C2:MDWV FM,MDSP,SQUARE,SRC,EXT,FRQ,250HZ,AMP,2.5V,DEPTH,50,'
+        b'DEVI,90\n']
+    # the malformed width parameter is never sent
+    assert not any(b'WIDTH' in message for message in messages)
+
+
+class FakeVisaError(Exception):
+    """ Error raised by the mocked instrument to simulate a failed write."""
+
+
+def fail_next_write(bk_com: BKCom) -> None:
+    """ Makes the next write to the mocked instrument fail (the ones after
+    it succeed again).
+
+    Args:
+        bk_com: The BKCom client object (see make_bk_com).
+    """
+    bk_com.instrument.write_raw.side_effect = [FakeVisaError(), None, None,
+                                               None, None, None]
+
+
+def test_repeated_command_is_skipped():
+    bk_com = make_bk_com()
+    bk_com.enable('C1')
+    bk_com.enable('C1')
+
+    assert written(bk_com) == [b'C1:OUTP ON,LOAD,75,PLRT,NOR\n']
+
+
+def test_failed_write_is_retried():
+    bk_com = make_bk_com()
+    bk_com.enable('C1')
+    fail_next_write(bk_com)
+    try:
+        bk_com.disable('C1')
+    except FakeVisaError:
+        pass
+    bk_com.enable('C1')
+
+    # the failed OFF is not remembered, so the ON is written again
+    assert written(bk_com) == [b'C1:OUTP ON,LOAD,75,PLRT,NOR\n',
+                               b'C1:OUTP OFF,LOAD,75,PLRT,NOR\n',
+                               b'C1:OUTP ON,LOAD,75,PLRT,NOR\n']
+
+
+def test_failed_batch_invalidates_cache():
+    bk_com = make_bk_com()
+    bk_com.send_waveform('C2')
+    fail_next_write(bk_com)
+    try:
+        with bk_com.batch():
+            bk_com.enable('C1')
+            bk_com.send_waveform('C1')
+    except FakeVisaError:
+        pass
+    bk_com.enable('C1')
+    bk_com.send_waveform('C1')
+    bk_com.send_waveform('C2')
+
+    # nothing written by (or before) the failed batch is considered known
+    assert written(bk_com)[2:] == [
+        b'C1:OUTP ON,LOAD,75,PLRT,NOR\n',
+        b'C1:BaSic_WaVe WVTP,SINE,FRQ,1000HZ,AMP,5V,OFST,0V,'
+        b'MAX_OUTPUT_AMP,5V,WIDTH,1\n',
+        b'C2:BaSic_WaVe WVTP,SINE,FRQ,1000HZ,AMP,5V,OFST,0V,'
+        b'MAX_OUTPUT_AMP,5V,WIDTH,1\n']
+
+
+def test_commands_of_failed_batch_body_are_not_remembered():
+    bk_com = make_bk_com()
+    try:
+        with bk_com.batch():
+            bk_com.enable('C1')
+            raise RuntimeError
+    except RuntimeError:
+        pass
+    bk_com.enable('C1')
+
+    assert written(bk_com) == [b'C1:OUTP ON,LOAD,75,PLRT,NOR\n']
+
+
+def test_disable_is_always_written():
+    bk_com = make_bk_com()
+    bk_com.disable('C1')
+    bk_com.disable('C1')
+    with bk_com.batch():
+        bk_com.disable('C1')
+        bk_com.disable('C1')
+
+    assert written(bk_com) == [
+        b'C1:OUTP OFF,LOAD,75,PLRT,NOR\n',
+        b'C1:OUTP OFF,LOAD,75,PLRT,NOR\n',
+        b'C1:OUTP OFF,LOAD,75,PLRT,NOR;C1:OUTP OFF,LOAD,75,PLRT,NOR\n']
+
+
+def test_background_write_error_disables_cache():
+    bk_com = make_bk_com(background_writes=True)
+    try:
+        fail_next_write(bk_com)
+        bk_com.enable('C1')
+        # wait for the failed write without raising its error yet
+        while bk_com._writer_error is None:
+            time.sleep(0.001)
+        bk_com.enable('C1')
+        try:
+            bk_com.sync()
+        except FakeVisaError:
+            pass
+        bk_com.enable('C1')
+        bk_com.sync()
+    finally:
+        bk_com.close()
+
+    assert written(bk_com) == [b'C1:OUTP ON,LOAD,75,PLRT,NOR\n'] * 3
+
+
+def written_waveform(channel: str) -> bytes:
+    """ Gets the command written for a default waveform.
+
+    Args:
+        channel: The channel of the waveform (C1 or C2).
+
+    Returns:
+        The command (bytes, without termination).
+    """
+    return (channel.encode('ascii')
+            + b':BaSic_WaVe WVTP,SINE,FRQ,1000HZ,AMP,5V,OFST,0V,'
+            b'MAX_OUTPUT_AMP,5V,WIDTH,1')
+
+
+def test_send_waveform_many_splits_at_limit():
+    waveforms = [dict(channel='C1'), dict(channel='C2')]
+    command_length = len(written_waveform('C1'))
+
+    # the separator and the termination count towards the limit
+    limit = 2 * command_length + 1 + 1
+    bk_com = make_bk_com()
+    bk_com.send_waveform_many(waveforms, max_message_length=limit)
+    assert written(bk_com) == [
+        written_waveform('C1') + b';' + written_waveform('C2') + b'\n']
+
+    bk_com = make_bk_com()
+    bk_com.send_waveform_many(waveforms, max_message_length=limit - 1)
+    assert written(bk_com) == [written_waveform('C1') + b'\n',
+                               written_waveform('C2') + b'\n']
+    assert all(len(message) <= limit - 1 for message in written(bk_com))
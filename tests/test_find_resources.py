@@ -0,0 +1,51 @@
+"""
+Created for the UoS QLM group on 14 October 2026. The purpose of this module
+is to test the cache of the kinesis devices listed by coms.find_resources,
+using a mocked pylablib listing (no device is needed).
+
+
+Last update: 14 October 2026.
+"""
+from unittest import mock
+
+import pytest
+
+pytest.importorskip('pyvisa')
+pytest.importorskip('pylablib')
+
+from coms import find_resources  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    """ Forgets the kinesis devices listed before and after each test."""
+    find_resources.invalidate_kdc_101_cache()
+    yield
+    find_resources.invalidate_kdc_101_cache()
+
+
+def test_empty_listing_is_not_cached():
+    listings = [[], [('27005180', 'Brushed Motor Controller')]]
+    with mock.patch.object(find_resources.Thorlabs, 'list_kinesis_devices',
+                           side_effect=listings) as list_kinesis_devices:
+        with pytest.raises(Exception, match='DeviceNotFound'):
+            find_resources.find_available_kdc_101()
+
+        # the motor plugged in after the failed call is found
+        assert find_resources.find_available_kdc_101() == ['27005180']
+
+    assert list_kinesis_devices.call_count == 2
+
+
+def test_listing_is_cached():
+    listing = [('27005180', 'Brushed Motor Controller'),
+               ('83000001', 'Stepper Motor Controller')]
+    with mock.patch.object(find_resources.Thorlabs, 'list_kinesis_devices',
+                           return_value=listing) as list_kinesis_devices:
+        assert find_resources.find_available_kdc_101() == ['27005180']
+        assert find_resources.find_available_kdc_101() == ['27005180']
+        assert list_kinesis_devices.call_count == 1
+
+        find_resources.invalidate_kdc_101_cache()
+        assert find_resources.find_available_kdc_101() == ['27005180']
+        assert list_kinesis_devices.call_count == 2
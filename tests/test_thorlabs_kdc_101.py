@@ -0,0 +1,96 @@
+"""
+Created for the UoS QLM group on 14 October 2026. The purpose of this module
+is to test the moves sent by the coms.thorlabs_kdc_101.KDC101Com client
+class, using a mocked pylablib motor (no motor is needed).
+
+
+Last update: 14 October 2026.
+"""
+from unittest import mock
+
+import pytest
+
+pytest.importorskip('pylablib')
+
+from coms import thorlabs_kdc_101  # noqa: E402
+
+
+class FakeMoveError(Exception):
+    """ Error raised by the mocked motor to simulate a failed move."""
+
+
+@pytest.fixture
+def kdc_101():
+    """ KDC101Com client whose pylablib motor is a mock (1 mm corresponds to
+    20 internal units and the motor is never moving).
+    """
+    motor = mock.MagicMock()
+    motor.get_gen_move_parameters.return_value = (1,)
+    motor.is_moving.return_value = False
+    with mock.patch.object(thorlabs_kdc_101.Thorlabs, 'KinesisMotor',
+                           return_value=motor):
+        client = thorlabs_kdc_101.KDC101Com('27000000', low_latency=False)
+    yield client
+    client.close()
+
+
+def moves(kdc_101) -> list:
+    """ Gets the targets (in internal units) sent to the mocked motor.
+
+    Args:
+        kdc_101: The KDC101Com client object (see the kdc_101 fixture).
+
+    Returns:
+        List of the targets of every move_to call made so far.
+    """
+    return [call.args[0] for call in kdc_101.motor.move_to.call_args_list]
+
+
+def test_repeated_move_is_skipped(kdc_101):
+    kdc_101.move_to_position(1.0)
+    kdc_101.move_to_position(1.0)
+
+    assert moves(kdc_101) == [20]
+
+
+def test_failed_move_is_retried(kdc_101):
+    kdc_101.motor.move_to.side_effect = [FakeMoveError(), None]
+    with pytest.raises(FakeMoveError):
+        kdc_101.move_to_position(1.0)
+    kdc_101.move_to_position(1.0)
+
+    assert moves(kdc_101) == [20, 20]
+
+
+def test_failed_wait_is_retried(kdc_101):
+    kdc_101.motor.is_moving.side_effect = [FakeMoveError(), False]
+    with pytest.raises(FakeMoveError):
+        kdc_101.move_to_position(1.0)
+    kdc_101.move_to_position(1.0)
+
+    assert moves(kdc_101) == [20, 20]
+
+
+def test_invalidate_position_forces_move(kdc_101):
+    kdc_101.move_to_position(1.0)
+    kdc_101.invalidate_position()
+    kdc_101.move_to_position(1.0)
+
+    assert moves(kdc_101) == [20, 20]
+
+
+def test_home_always_moves(kdc_101):
+    kdc_101.move_to_position(1.0)
+    kdc_101.home(new_home_position=1.0)
+    kdc_101.home()
+
+    assert moves(kdc_101) == [20, 20, 20]
+
+
+def test_stop_forgets_target(kdc_101):
+    kdc_101.move_to_position(1.0)
+    kdc_101.stop()
+    kdc_101.move_to_position(1.0)
+
+    kdc_101.motor.stop.assert_called_once_with(immediate=True, sync=False)
+    assert moves(kdc_101) == [20, 20]
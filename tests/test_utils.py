@@ -0,0 +1,225 @@
+"""
+Created for the UoS QLM group on 14 October 2026. The purpose of this module
+is to test the pixel patterns of experiments.utils against the loops they
+were first built with (the vectorised and cached patterns must give the
+same coordinates).
+
+
+Last update: 14 October 2026.
+"""
+import pytest
+
+np = pytest.importorskip('numpy')
+pytest.importorskip('matplotlib')
+
+import utils  # noqa: E402
+
+# the start pixels and pixel lengths the patterns are compared for
+START_PIXELS = [(0.0, 0.0), (0.5152478134110787, 5.314402332361516),
+                (-1.25, 3.0)]
+PIXEL_LENGTHS = [1.0, 4E-6, 0.004]
+
+
+def baseline_horizontal_pattern(start_pixel, n_pixels, pixel_length,
+                                direction):
+    """ The horizontal line pattern as first built (one point at a time)."""
+    pattern = np.zeros((n_pixels, 2))
+    for i in range(n_pixels):
+        pattern[i][0] += direction * pixel_length * i + start_pixel[0]
+        pattern[i][1] = start_pixel[1]
+    return pattern
+
+
+def baseline_vertical_pattern(start_pixel, n_pixels, pixel_length,
+                              direction):
+    """ The vertical line pattern as first built (one point at a time)."""
+    pattern = np.zeros((n_pixels, 2))
+    for i in range(n_pixels):
+        pattern[i][0] = start_pixel[0]
+        pattern[i][1] += direction * pixel_length * i + start_pixel[1]
+    return pattern
+
+
+def baseline_square_pattern(start_pixel, n_pixels, pixel_length):
+    """ The square pattern as first built (numbering a map of the pixels
+    in lawnmower pattern).
+    """
+    pixel_map = np.zeros((n_pixels, n_pixels, 3))
+    pixel_number = 0
+    for i in range(n_pixels):
+        for j in range(n_pixels):
+            if i % 2 == 0:
+                y_index = 2 * j + 1
+            else:
+                y_index = 2 * (n_pixels - j) - 1
+            pixel_map[i][j] = [
+                (2 * i + 1) * pixel_length / 2 + start_pixel[0],
+                y_index * pixel_length / 2 + start_pixel[1],
+                pixel_number]
+            pixel_number += 1
+
+    pattern = np.zeros((n_pixels ** 2, 2))
+    for i in range(n_pixels):
+        for j in range(n_pixels):
+            pixel_number = int(pixel_map[i][j][2])
+            pattern[pixel_number] = pixel_map[i][j][:2]
+    return pattern
+
+
+def baseline_lines_pattern(start_pixel, pixel_length, lines):
+    """ A letter pattern as first built (each line starting from the last
+    point of the previous one).
+
+    Args:
+        start_pixel: Coordinates of the first pixel of the letter.
+        pixel_length: The length of a pixel.
+        lines: Sequence of (line pattern function, n_pixels, direction).
+    """
+    pattern = None
+    for line_pattern, n_pixels, direction in lines:
+        line = line_pattern(
+            start_pixel=start_pixel if pattern is None else pattern[-1],
+            n_pixels=n_pixels, pixel_length=pixel_length,
+            direction=direction)
+        if pattern is None:
+            pattern = line
+        else:
+            pattern = np.concatenate((pattern, line))
+    return pattern
+
+
+def baseline_s_pattern(start_pixel, n_pixels, pixel_length):
+    horizontal = baseline_horizontal_pattern
+    vertical = baseline_vertical_pattern
+    return baseline_lines_pattern(
+        start_pixel, pixel_length,
+        [(horizontal, n_pixels, 1), (vertical, n_pixels, 1),
+         (horizontal, n_pixels, -1), (vertical, n_pixels, 1),
+         (horizontal, n_pixels, 1)])
+
+
+def baseline_o_pattern(start_pixel, n_pixels_width, n_pixels_height,
+                       pixel_length):
+    horizontal = baseline_horizontal_pattern
+    vertical = baseline_vertical_pattern
+    return baseline_lines_pattern(
+        start_pixel, pixel_length,
+        [(horizontal, n_pixels_width, 1), (vertical, n_pixels_height, 1),
+         (horizontal, n_pixels_width, -1), (vertical, n_pixels_height, -1)])
+
+
+def baseline_t_pattern(start_pixel, n_pixels_width, n_pixels_height,
+                       pixel_length):
+    t_pattern = baseline_vertical_pattern(
+        start_pixel=start_pixel, n_pixels=n_pixels_height,
+        pixel_length=pixel_length, direction=1)
+    bar = [baseline_horizontal_pattern(
+        start_pixel=t_pattern[-1], n_pixels=int(n_pixels_width / 2) + 1,
+        pixel_length=pixel_length, direction=direction)
+        for direction in (-1, 1)]
+    return np.concatenate([t_pattern] + bar)
+
+
+def baseline_n_pattern(start_pixel, n_pixels_width, n_pixels_height,
+                       pixel_length):
+    n_pattern = baseline_vertical_pattern(
+        start_pixel=start_pixel, n_pixels=n_pixels_height,
+        pixel_length=pixel_length, direction=1)
+    for n in range(int(n_pixels_width / 2)):
+        diagonal_point = n_pattern[-1] + [pixel_length, -pixel_length]
+        n_pattern = np.concatenate((n_pattern,
+                                    np.reshape(diagonal_point, (1, 2))))
+    pattern = baseline_vertical_pattern(
+        start_pixel=np.asarray(start_pixel)
+        + [(n_pixels_width - 1) * pixel_length, 0],
+        n_pixels=n_pixels_height, pixel_length=pixel_length, direction=1)
+    return np.concatenate((n_pattern, pattern))
+
+
+def baseline_soton_pattern(start_pixel, pixel_length):
+    start_pixel = np.asarray(start_pixel)
+    letters = [
+        baseline_s_pattern(start_pixel=start_pixel,
+                           pixel_length=pixel_length, n_pixels=3),
+        baseline_o_pattern(start_pixel=start_pixel + [pixel_length * 3, 0],
+                           pixel_length=pixel_length, n_pixels_height=5,
+                           n_pixels_width=3),
+        baseline_t_pattern(start_pixel=start_pixel + [pixel_length * 7, 0],
+                           pixel_length=pixel_length, n_pixels_height=5,
+                           n_pixels_width=3),
+        baseline_o_pattern(start_pixel=start_pixel + [pixel_length * 9, 0],
+                           pixel_length=pixel_length, n_pixels_height=5,
+                           n_pixels_width=3),
+        baseline_n_pattern(start_pixel=start_pixel + [pixel_length * 12, 0],
+                           pixel_length=pixel_length, n_pixels_height=5,
+                           n_pixels_width=4)]
+    return np.concatenate(letters)
+
+
+# the letter patterns, their baselines and the arguments they are built with
+LETTERS = [
+    (utils.get_s_pattern, baseline_s_pattern, dict(n_pixels=3)),
+    (utils.get_o_pattern, baseline_o_pattern,
+     dict(n_pixels_width=3, n_pixels_height=5)),
+    (utils.get_t_pattern, baseline_t_pattern,
+     dict(n_pixels_width=3, n_pixels_height=5)),
+    (utils.get_n_pattern, baseline_n_pattern,
+     dict(n_pixels_width=4, n_pixels_height=5))]
+
+
+@pytest.mark.parametrize('start_pixel', START_PIXELS)
+@pytest.mark.parametrize('pixel_length', PIXEL_LENGTHS)
+@pytest.mark.parametrize('n_pixels', [1, 3, 4])
+def test_square_pattern_matches_baseline(start_pixel, pixel_length,
+                                         n_pixels):
+    pattern = utils.get_square_pattern(start_pixel=start_pixel,
+                                       n_pixels=n_pixels,
+                                       pixel_length=pixel_length)
+
+    np.testing.assert_array_max_ulp(
+        pattern, baseline_square_pattern(start_pixel, n_pixels,
+                                         pixel_length), maxulp=1)
+
+
+@pytest.mark.parametrize('start_pixel', START_PIXELS)
+@pytest.mark.parametrize('pixel_length', PIXEL_LENGTHS)
+def test_soton_pattern_matches_baseline(start_pixel, pixel_length):
+    pattern = utils.get_soton_pattern(start_pixel=np.array(start_pixel),
+                                      pixel_length=pixel_length)
+
+    np.testing.assert_array_max_ulp(
+        pattern, baseline_soton_pattern(start_pixel, pixel_length),
+        maxulp=1)
+
+
+@pytest.mark.parametrize('start_pixel', START_PIXELS)
+@pytest.mark.parametrize('pixel_length', PIXEL_LENGTHS)
+@pytest.mark.parametrize('get_pattern, baseline_pattern, kwargs', LETTERS)
+def test_letter_pattern_matches_baseline(start_pixel, pixel_length,
+                                         get_pattern, baseline_pattern,
+                                         kwargs):
+    pattern = get_pattern(start_pixel=np.array(start_pixel),
+                          pixel_length=pixel_length, **kwargs)
+
+    np.testing.assert_array_max_ulp(
+        pattern, baseline_pattern(start_pixel=start_pixel,
+                                  pixel_length=pixel_length, **kwargs),
+        maxulp=1)
+
+
+def test_cached_patterns_are_read_only():
+    square_pattern = utils.get_square_pattern(start_pixel=[0.5, 5.3],
+                                              n_pixels=3, pixel_length=4E-6)
+    soton_pattern = utils.get_soton_pattern(start_pixel=np.array([0.5, 5.3]),
+                                            pixel_length=4E-6)
+
+    for pattern in (square_pattern, soton_pattern):
+        assert not pattern.flags.writeable
+        with pytest.raises(ValueError):
+            pattern[0, 0] = 0
+
+    # the same (cached) arrays are returned again
+    assert utils.get_square_pattern(start_pixel=[0.5, 5.3], n_pixels=3,
+                                    pixel_length=4E-6) is square_pattern
+    assert utils.get_soton_pattern(start_pixel=np.array([0.5, 5.3]),
+                                   pixel_length=4E-6) is soton_pattern